@@ -0,0 +1,84 @@
+"""Benchmark PDF export on a synthetic library.
+
+Lays out the same corpus cold (empty fragment cache) once per worker
+count, then once more warm, and prints the timings as JSON.
+
+Usage:
+    python -m benchmarks.pdf_export [--articles 1000] [--workers 1,2,4,8]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from src.utils.pdf_exporter import MultiArticlePDFExporter
+
+WORDS = (
+    "model training data neural network language vision research results benchmark "
+    "learning robust efficient inference scaling evaluation dataset transformer agents "
+    "reasoning retrieval multimodal quantum privacy safety accuracy latency hardware"
+).split()
+
+
+def synthetic_articles(count, seed=0):
+    """Build articles shaped like scraped blog posts: a few sections of summarized paragraphs."""
+    rng = random.Random(seed)
+
+    def sentence(words):
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    articles = []
+    for idx in range(count):
+        sections = []
+        for section_id in range(1, rng.randint(4, 8) + 1):
+            paragraphs = [
+                {'original': ' '.join(sentence(18) for _ in range(6)), 'summary': sentence(rng.randint(25, 45))}
+                for _ in range(rng.randint(2, 5))
+            ]
+            sections.append({'section_id': section_id, 'section_title': sentence(5), 'paragraphs': paragraphs})
+        articles.append({
+            'title': sentence(8),
+            'url': f"https://research.google/blog/synthetic-{idx}/",
+            'published_date': f"2025-{idx % 12 + 1:02d}-{idx % 28 + 1:02d}",
+            'author': 'Synthetic Author',
+            'sections': sections,
+        })
+    return articles
+
+
+def run(articles, workers, cache_dir):
+    exporter = MultiArticlePDFExporter(cache_dir=cache_dir, include_images=False)
+    started_at = time.perf_counter()
+    pdf = exporter.render(articles, workers=workers)
+    return {
+        'workers': exporter.last_stats['workers'],
+        'cached': exporter.last_stats['cached'],
+        'seconds': round(time.perf_counter() - started_at, 2),
+        'megabytes': round(len(pdf) / 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded PDF export on synthetic articles.")
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--workers', default=','.join(sorted({'1', str(os.cpu_count() or 1)}, key=int)),
+                        help="Comma-separated worker counts to compare (default: 1 and the CPU count)")
+    args = parser.parse_args()
+
+    articles = synthetic_articles(args.articles)
+    results = []
+    for workers in (int(count) for count in args.workers.split(',')):
+        cache_dir = tempfile.mkdtemp(prefix='pdf_bench_')
+        try:
+            results.append({'run': 'cold', **run(articles, workers, cache_dir)})
+            results.append({'run': 'warm', **run(articles, workers, cache_dir)})
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(json.dumps({'articles': args.articles, 'cpu_count': os.cpu_count(), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark reruns of the article reader on a long synthetic article.
+
+Times two things with Streamlit's AppTest:
+  app    - a full script rerun with the article open (what a click cost
+           before the reader became a fragment)
+  reader - the reader alone (what a click inside the reader fragment
+           reruns now)
+and counts the elements the reader sends to the browser.
+
+Usage:
+    python -m benchmarks.reader_rerun [--sections 60] [--runs 20]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from streamlit.testing.v1 import AppTest
+from benchmarks.pdf_export import synthetic_articles
+
+
+def long_article(sections):
+    """Join synthetic articles' sections into one article with the given number of sections."""
+    article = synthetic_articles(1, seed=1)[0]
+    article['sections'] = []
+    for source in synthetic_articles(sections, seed=2):
+        article['sections'].extend(source['sections'])
+    article['sections'] = article['sections'][:sections]
+    return article
+
+
+def app_script(file_path):
+    import streamlit as st
+    from src.app import run_streamlit_app
+    st.session_state.selected_articles = {file_path}
+    run_streamlit_app()
+
+
+def reader_script(file_path):
+    from src.app import display_article, load_article_body
+    display_article(load_article_body(file_path))
+
+
+def time_reruns(script, file_path, runs):
+    app = AppTest.from_function(script, args=(file_path,), default_timeout=60)
+    app.run()  # warm up imports and caches
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return {
+        'median_ms': round(statistics.median(timings), 1),
+        'elements': sum(1 for _ in app.main),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reader reruns on a long synthetic article.")
+    parser.add_argument('--sections', type=int, default=60)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    article = long_article(args.sections)
+    tmp_dir = tempfile.mkdtemp(prefix='reader_bench_')
+    try:
+        file_path = os.path.join(tmp_dir, '0_long_article.json')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(article, f)
+        results = {
+            'sections': args.sections,
+            'paragraphs': sum(len(section['paragraphs']) for section in article['sections']),
+            'app': time_reruns(app_script, file_path, args.runs),
+            'reader': time_reruns(reader_script, file_path, args.runs),
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,4 @@
-from src.websites.google_ai_links_scraper import scrape_homepage
-from src.websites.google_ai_article_scraper import scrape_articles_from_links
-from src.image_downloader import batch_process_articles
-from src.summarizer import batch_process_articles as summarize_articles
+from src.pipeline import STEPS, get_pipeline_job
 from src.utils.logger import setup_logger
 import streamlit as st
 import pandas as pd
@@ -23,55 +20,78 @@ def count_new_articles():
         logger.error(f"Error counting new articles: {e}")
         return 0
 
-def scrape_and_process():
-    """Run the scraping pipeline with detailed progress indicators."""
-    try:
-        with st.status("🔄 Starting scraping pipeline...") as status:
-            progress_placeholder = st.empty()
-            progress_bar = progress_placeholder.progress(0)
-            
-            def update_progress(progress, message):
-                progress_bar.progress(int(progress * 100))
-                status.write(message)
-            
-            # Step 1: Scrape homepage
-            status.write("### 📡 Step 1/4: Scraping Google AI homepage...")
-            initial_links = scrape_homepage()
-            progress_bar.progress(25)
-            
-            # Step 2: Scrape articles
-            status.write("### 📑 Step 2/4: Downloading article content...")
-            processed_count = scrape_articles_from_links(update_progress)
-            progress_bar.progress(50)
-            
-            # Step 3: Download images
-            status.write("### 🖼️ Step 3/4: Downloading images...")
-            results = batch_process_articles()
-            progress_bar.progress(75)
-            
-            # Step 4: Generate summaries with Ollama
-            status.write("### 📝 Step 4/4: Generating summaries...")
-            summary_results = summarize_articles()
-            progress_bar.progress(100)
-            
-            # Final summary
-            status.update(
-                label=(f"✅ Done!"),
-                state="complete"
-            )
-            progress_placeholder.empty()
-            
-            return {
-                'new_articles': len(initial_links or []),
-                'processed_articles': processed_count,
-                'images_downloaded': sum(r.get('new_downloads', 0) for r in results if r),
-                'summaries_generated': summary_results['processed']
+def render_run_metrics(metrics):
+    """Show where the last fetch spent its time, slowest spans first."""
+    with st.expander("Where the time went", icon=":material/timer:"):
+        rows = [
+            {
+                'Span': span['span'] + ''.join(f" ({value})" for value in span['labels'].values()),
+                'Calls': span['count'],
+                'Total (s)': span['total_s'],
+                'p50 (s)': span['p50_s'],
+                'p95 (s)': span['p95_s'],
             }
-            
-    except Exception as e:
-        logger.error(f"Error in scraping process: {str(e)}", exc_info=True)
-        st.error("❌ Error during scraping. Check logs for details.")
-        return None
+            for span in sorted(metrics['spans'], key=lambda span: span['total_s'], reverse=True)
+        ]
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        st.caption("Spans overlap: stages run in parallel, and fetch time includes parsing. "
+                   "Full report and Prometheus textfile in data/processed/metrics.")
+
+def render_pipeline_status():
+    """Show the background pipeline's progress, or the button that starts it."""
+    job = get_pipeline_job()
+    state = job.status()
+    running = state['status'] in ('running', 'cancelling')
+
+    if running:
+        step = state.get('step', 0)
+        st.progress(state.get('progress', 0.0),
+                    text=f"Step {step + 1}/{len(STEPS)}: {STEPS[step]}")
+        st.caption(state.get('message', ''))
+        if st.button("Cancel", icon=":material/cancel:", use_container_width=True,
+                     disabled=state['status'] == 'cancelling', key="cancel_pipeline"):
+            job.cancel()
+    else:
+        if st.button("Fetch new articles", icon=":material/refresh:", type="primary",
+                     use_container_width=True, key="start_pipeline"):
+            if not job.start():
+                st.warning("Another fetch is already running.")
+            st.rerun()
+
+        if state['status'] == 'complete':
+            results = state.get('results', {})
+            st.success(
+                f"Last fetch: {results.get('processed_articles', 0)} articles, "
+                f"{results.get('images_downloaded', 0)} images, "
+                f"{results.get('summaries_generated', 0)} summaries."
+            )
+            st.caption(
+                f"Unchanged articles skipped without reading: "
+                f"{results.get('images_skipped_unread', 0)} for images, "
+                f"{results.get('summaries_skipped_unread', 0)} for summaries."
+            )
+        elif state['status'] == 'cancelled':
+            st.info("The last fetch was cancelled.")
+        elif state['status'] == 'out_of_time':
+            st.info("The last scheduled fetch reached its time budget; the rest continues next run.")
+        elif state['status'] == 'failed':
+            st.error(f"The last fetch failed: {state.get('error', 'see logs')}")
+        elif state['status'] == 'interrupted':
+            st.warning("The last fetch was interrupted before it finished.")
+
+        if state.get('metrics', {}).get('spans'):
+            render_run_metrics(state['metrics'])
+
+    # Reload the library as each new article is saved, and once a run this
+    # session was watching finishes; st.rerun from a fragment reruns the whole app
+    was_running = st.session_state.get('pipeline_running', False)
+    saved = state.get('articles_saved', 0) if running else 0
+    was_saved = st.session_state.get('pipeline_articles_saved', 0)
+    st.session_state.pipeline_running = running
+    st.session_state.pipeline_articles_saved = saved
+    if (was_running and not running) or saved > was_saved:
+        st.rerun(scope="app")
+
 
 def main():
     st.set_page_config(
@@ -83,13 +103,9 @@ def main():
     # Add scrape button in sidebar
     with st.sidebar:
         st.subheader("Library")
-        if st.button("Fetch new articles", icon=":material/refresh:", type="primary", use_container_width=True):
-            try:
-                results = scrape_and_process()
-                if results:
-                    st.success("Scraping completed successfully.")
-            except Exception as e:
-                st.error(f"Failed to complete scraping: {str(e)}")
+        # Poll only while a run is in progress; the rest of the app keeps working meanwhile
+        running = get_pipeline_job().is_running()
+        st.fragment(render_pipeline_status, run_every=2 if running else None)()
         st.divider()
 
     # Run the article viewer
@@ -1,15 +1,31 @@
 import streamlit as st
-import json
+import bisect
+import html
 import os
-from PIL import Image
 from datetime import datetime
-from urllib.parse import urlparse
+from src.article_cache import get_article_cache
+from src.embeddings import OllamaEmbedder, get_embedding_store
+from src.library_index import get_library_index
+from src.prefetch import get_prefetcher
 from src.utils.config import get_config
-from src.utils.pdf_exporter import MultiArticlePDFExporter
-import tempfile
+from src.utils.dates import display_date, format_iso_date
+from src.utils.images import display_image, get_local_image_path
+from src.utils.sources import get_source_name
+from src.utils.llm_metrics import get_llm_metrics
+from src.utils.metrics import timed
+from src.utils.read_status import load_read_status, set_read_status
+from src.utils.summary_versions import get_active_version, paragraph_summary
+from src.utils.pdf_exporter import submit_export
+from src.summarizer import ERROR_SUMMARY, ArticleSummarizer, needs_summarization, request_summary, save_summaries
+from src.summary_queue import get_summary_queue
+from src.digest import article_tldr, update_digest
+import pandas as pd
 
 config = get_config()
 
+# Rows shown per page of the export picker; the sidebar renders this many checkboxes at most
+EXPORT_PICKER_PAGE_SIZE = 10
+
 CUSTOM_CSS = """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Source+Serif+4:opsz,wght@8..60,400;8..60,600;8..60,700&family=Inter:wght@400;500;600&display=swap');
@@ -102,6 +118,14 @@ div[data-testid="stVerticalBlockBorderWrapper"]:hover {
     line-height: 1.7;
 }
 
+/* Article TL;DR on library cards */
+.card-tldr {
+    color: #3f3f3f;
+    font-size: 0.92rem;
+    line-height: 1.5;
+    margin-top: 0.15rem;
+}
+
 /* Unread marker */
 .unread-dot {
     color: #A16207;
@@ -111,104 +135,29 @@ div[data-testid="stVerticalBlockBorderWrapper"]:hover {
 """
 
 
+@timed('load_articles')
 def load_articles():
-    """Load all article JSON files."""
-    articles_dir = config['data_dir']
+    """Load card data for all articles from the library index, newest first."""
     articles = []
     try:
-        for filename in os.listdir(articles_dir):
-            if filename.endswith('.json'):
-                file_path = os.path.join(articles_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    article = json.load(f)
-                    article['_file_path'] = file_path  # Add file path to article data
-                    articles.append(article)
+        index = get_library_index()
+        index.sync(config['data_dir'])
+        articles = index.cards()
     except Exception as e:
         st.error(f"Error loading articles: {str(e)}")
     return articles
 
 
-def get_local_image_path(article_index, section_id):
-    """Get all image paths for a section."""
-    if not article_index:
-        return []
-
-    base_path = os.path.join(config.get('images_dir', 'images'), f'article_{article_index.strip()}')
-    found_images = []
-
-    # Expanded patterns to catch more image variations
-    base_patterns = [
-        # Standard patterns
-        f'image_{section_id}.jpg',
-        f'image_{section_id}.png',
-        f'image_{section_id}.jpeg',
-        # Number after section
-        f'image_{section_id}_1.jpg',
-        f'image_{section_id}_2.jpg',
-        f'image_{section_id}_3.jpg',
-        f'image_{section_id}_4.jpg',
-        # Number with dot separator
-        f'image_{section_id}.1.jpg',
-        f'image_{section_id}.2.jpg',
-        f'image_{section_id}.3.jpg',
-        f'image_{section_id}.4.jpg'
-    ]
-
-    # Add PNG and JPEG variations
-    all_patterns = []
-    for pattern in base_patterns:
-        all_patterns.append(pattern)
-        all_patterns.append(pattern.replace('.jpg', '.png'))
-        all_patterns.append(pattern.replace('.jpg', '.jpeg'))
-
-    # Check all patterns
-    for pattern in all_patterns:
-        path = os.path.join(base_path, pattern)
-        if os.path.exists(path):
-            found_images.append(path)
-
-    # Sort found images to ensure consistent order
-    found_images.sort()
-    return found_images
-
-
-def parse_date(date_str):
-    """Parse date string to datetime object."""
-    if not date_str:
-        return datetime.min
-    try:
-        # Try different date formats
-        for fmt in ['%B %d, %Y', '%Y-%m-%d', '%d/%m/%Y']:
-            try:
-                return datetime.strptime(date_str.strip(), fmt)
-            except ValueError:
-                continue
-        return datetime.min
-    except (ValueError, TypeError):
-        return datetime.min
-
-
-def get_source_name(url):
-    """Derive a readable publisher name from an article URL."""
-    if not url:
-        return ''
-    lowered = url.lower()
-    if 'research.google' in lowered or 'googleblog' in lowered:
-        return 'Google Research'
-    if 'nvidia.com' in lowered:
-        return 'NVIDIA'
-    try:
-        domain = urlparse(url).netloc.replace('www.', '').split('.')[0]
-        return domain.capitalize()
-    except Exception:
-        return ''
+def load_article_body(file_path):
+    """Load the full article (sections and paragraphs) for a library card's file."""
+    return get_article_cache().get(file_path)
 
 
 def display_article(article):
     """Display an article with its summaries and images."""
     meta_parts = [
         get_source_name(article.get('url', '')),
-        article.get('published_date', ''),
+        display_date(article),
         article.get('author', ''),
     ]
     meta_line = ' &nbsp;·&nbsp; '.join(part for part in meta_parts if part)
@@ -220,209 +169,357 @@ def display_article(article):
     if article.get('url'):
         st.markdown(f"[Read the original article]({article['url']})")
 
-    st.markdown("---")
-
     # Get article index from file path
     file_path = article.get('_file_path', '')
     article_index = os.path.basename(file_path).split('_')[0]
 
+    # Read the served summary version once so the whole article renders consistently
+    active_version = get_active_version()
+
+    # Offer on-demand summarization for articles the pipeline hasn't reached yet
+    summarizer = None
+    new_summaries = {}
+    if needs_summarization(article):
+        if file_path in get_summary_queue():
+            st.info("This article is queued for summarization; showing the original text.")
+        else:
+            st.info("This article hasn't been summarized yet; showing the original text.")
+        cols = st.columns(2)
+        with cols[0]:
+            if st.button("Summarize now", icon=":material/auto_awesome:", key="summarize_now",
+                         use_container_width=True):
+                try:
+                    summarizer = ArticleSummarizer()
+                except (ConnectionError, ValueError) as e:
+                    st.error(str(e))
+        with cols[1]:
+            if file_path and st.button("Summarize in background", icon=":material/schedule:",
+                                       key="summarize_later", use_container_width=True):
+                request_summary(file_path, article.get('published_date', ''))
+                st.toast("Moved to the front of the summary queue.")
+
+    st.markdown("---")
+
+    # Text is batched into one markdown block per run of paragraphs rather than one element each
     for section_idx, section in enumerate(article.get('sections', [])):
+        blocks = []
         if section.get('section_title'):
-            st.subheader(section['section_title'])
+            blocks.append(f"### {section['section_title']}")
 
         # Get and display all images for this section
         image_paths = get_local_image_path(article_index, section_idx + 1)
         if image_paths:
+            st.markdown("\n\n".join(blocks))
+            blocks = []
             num_images = len(image_paths)
             if num_images > 1:
                 cols = st.columns(min(num_images, 2))
 
             for idx, img_path in enumerate(image_paths):
+                # Encoded display bytes come from a shared cache; st.image sends them as they are
+                image = display_image(img_path)
+                if image is None:
+                    st.error(f"Error loading image {img_path}")
+                    continue
+                data, output_format = image
+
+                if num_images > 1:
+                    col_idx = idx % 2
+                    cols[col_idx].image(  # type: ignore
+                        data,
+                        use_container_width=True,
+                        output_format=output_format
+                    )
+                else:
+                    st.image(
+                        data,
+                        use_container_width=True,
+                        output_format=output_format
+                    )
+
+        # Collect paragraphs, streaming fresh summaries when requested
+        paragraphs = []
+        for paragraph_idx, paragraph in enumerate(section.get('paragraphs', [])):
+            summary = paragraph_summary(paragraph, active_version)
+            if summary is not None:
+                blocks.append(summary)
+            elif summarizer:
+                if blocks:
+                    st.markdown("\n\n".join(blocks))
+                    blocks = []
+                if isinstance(paragraph, str):
+                    paragraph = {'original': paragraph}
+                original = paragraph.get('original', '')
                 try:
-                    image = Image.open(img_path)
-                    width, height = image.size
-                    max_width = 800
-                    if width > max_width:
-                        ratio = max_width / width
-                        new_size = (int(width * ratio), int(height * ratio))
-                        image = image.resize(new_size, Image.Resampling.LANCZOS)
-
-                    if num_images > 1:
-                        col_idx = idx % 2
-                        cols[col_idx].image(  # type: ignore
-                            image,
-                            use_container_width=True,
-                            output_format="PNG"
-                        )
-                    else:
-                        st.image(
-                            image,
-                            use_container_width=True,
-                            output_format="PNG"
-                        )
-
+                    summary = st.write_stream(summarizer.stream_paragraph(original)) if original.strip() else ''
                 except Exception as e:
-                    st.error(f"Error loading image {img_path}: {e}")
-
-        # Display paragraphs
-        for paragraph in section.get('paragraphs', []):
-            if isinstance(paragraph, dict) and 'summary' in paragraph:
-                st.write(paragraph['summary'])
+                    # Keep the paragraph unsummarized so it's retried rather than saving a partial summary
+                    st.warning(f"Summary interrupted: {e}")
+                    summary = ERROR_SUMMARY
+                if summary != ERROR_SUMMARY:
+                    paragraph.setdefault('summaries', {})[summarizer.version] = str(summary).strip()
+                    new_summaries[(section_idx, paragraph_idx)] = str(summary).strip()
             else:
-                st.write(paragraph)
+                blocks.append(paragraph.get('original', '') if isinstance(paragraph, dict) else paragraph)
+            paragraphs.append(paragraph)
+        section['paragraphs'] = paragraphs
+        if blocks:
+            st.markdown("\n\n".join(blocks))
+
+    if summarizer:
+        if not needs_summarization(article):
+            with st.spinner("Writing TL;DR..."):
+                try:
+                    update_digest(article, summarizer.version, summarizer.generate)
+                except Exception as e:
+                    st.warning(f"Could not build the article TL;DR: {e}")
+        summarizer.stop_server()
+        if file_path:
+            try:
+                # Merged into the file under its lock, so a background run's summaries aren't lost
+                save_summaries(file_path, summarizer.version, new_summaries,
+                               article.get('digests', {}).get(summarizer.version))
+                st.success("Summary saved.")
+            except (OSError, ValueError) as e:
+                st.error(f"Could not save summary: {e}")
 
+    if file_path:
+        render_related_articles(file_path)
 
-def load_read_status():
-    """Load the read status of articles from a JSON file."""
+
+def render_related_articles(file_path):
+    """List the articles closest to this one in embedding space."""
     try:
-        status_path = os.path.join(os.path.dirname(config['data_dir']), 'read_status.json')
-        with open(status_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+        related = get_embedding_store().related(file_path)
+    except Exception as e:
+        st.caption(f"Related articles unavailable: {e}")
+        return
+    if not related:
+        return
 
+    st.markdown("---")
+    st.subheader("Related articles")
+    for idx, entry in enumerate(related):
+        try:
+            title = load_article_body(entry['file_path']).get('title', 'Untitled')
+        except (OSError, ValueError):
+            continue
+        if st.button(title, key=f"related_{idx}", type="tertiary", icon=":material/article:"):
+            st.session_state.selected_articles = {entry['file_path']}
+            st.rerun()
 
-def save_read_status(read_status):
-    """Save the read status of articles to a JSON file."""
-    status_dir = os.path.dirname(config['data_dir'])
-    os.makedirs(status_dir, exist_ok=True)
-    status_path = os.path.join(status_dir, 'read_status.json')
-    with open(status_path, 'w') as f:
-        json.dump(read_status, f)
 
+def toggle_export_selection(article_id, widget_key):
+    """Add or remove one article from the export selection when its checkbox changes."""
+    if st.session_state[widget_key]:
+        st.session_state.export_selection.add(article_id)
+    else:
+        st.session_state.export_selection.discard(article_id)
 
-def create_export_section(filtered_articles):
-    """Create the export section in the sidebar."""
-    with st.expander("Export to PDF", icon=":material/picture_as_pdf:"):
-        st.caption("Select articles to export")
 
+def create_export_section(articles, filtered_articles):
+    """Create the export section in the sidebar.
+
+    The selection holds article file paths, so it survives filter and page
+    changes. Only one page of the picker is rendered per run.
+    """
+    with st.expander("Export to PDF", icon=":material/picture_as_pdf:"):
         # Initialize export selection
         if 'export_selection' not in st.session_state:
             st.session_state.export_selection = set()
+        selection = st.session_state.export_selection
 
-        # Select all/none buttons
+        # Bulk actions apply to everything matching the current filters, not just the visible page
+        matching_ids = [article['_file_path'] for article in filtered_articles]
         col1, col2 = st.columns(2)
         with col1:
-            if st.button("Select all", use_container_width=True):
-                st.session_state.export_selection = set(range(len(filtered_articles)))
+            if st.button(f"Add {len(matching_ids)} matching", use_container_width=True,
+                         disabled=not matching_ids, help="Select every article matching the current filters"):
+                selection.update(matching_ids)
                 st.rerun()
         with col2:
-            if st.button("Clear", use_container_width=True):
-                st.session_state.export_selection = set()
+            if st.button("Clear", use_container_width=True, disabled=not selection):
+                selection.clear()
                 st.rerun()
 
-        # Article selection checkboxes
-        for idx, article in enumerate(filtered_articles):
-            title = article.get('title', f'Article {idx}')
-            display_title = title[:50] + ('...' if len(title) > 50 else '')
+        # Picker: search and page through the matching articles, or review the selection
+        picker_search = st.text_input("Find article to export", key="export_search",
+                                      placeholder="Filter by title", icon=":material/search:")
+        selected_only = st.toggle("Show selected only", key="export_selected_only")
+        candidates = articles if selected_only else filtered_articles
+        candidates = [
+            article for article in candidates
+            if (not selected_only or article['_file_path'] in selection)
+            and picker_search.lower() in article.get('title', '').lower()
+        ]
 
-            if st.checkbox(
-                display_title,
-                key=f"export_{idx}",
-                value=idx in st.session_state.export_selection
-            ):
-                st.session_state.export_selection.add(idx)
-            else:
-                st.session_state.export_selection.discard(idx)
+        total_pages = max((len(candidates) - 1) // EXPORT_PICKER_PAGE_SIZE + 1, 1)
+        if st.session_state.get('export_page', 1) > total_pages:
+            st.session_state.export_page = total_pages
+        page = 1
+        if total_pages > 1:
+            page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages,
+                                   step=1, key="export_page")
+        start = (page - 1) * EXPORT_PICKER_PAGE_SIZE
+
+        for article in candidates[start:start + EXPORT_PICKER_PAGE_SIZE]:
+            article_id = article['_file_path']
+            title = article.get('title', '') or 'Untitled'
+            display_title = title[:50] + ('...' if len(title) > 50 else '')
+            widget_key = f"export_{article_id}"
+            st.checkbox(display_title, value=article_id in selection, key=widget_key,
+                        on_change=toggle_export_selection, args=(article_id, widget_key))
+        if not candidates:
+            st.caption("No articles to pick from.")
 
         # Export button
-        if st.session_state.export_selection:
-            st.caption(f"{len(st.session_state.export_selection)} selected")
+        if selection:
+            st.caption(f"{len(selection)} selected")
 
             if st.button("Export PDF", type="primary", icon=":material/download:", use_container_width=True):
-                export_selected_articles(filtered_articles)
+                export_selected_articles(articles)
 
+        # Poll only while an export is being rendered
+        export = st.session_state.get('pdf_export')
+        if export:
+            export['polling'] = not export['future'].done()
+            st.fragment(render_export_status, run_every=1 if export['polling'] else None)()
 
-def export_selected_articles(filtered_articles):
-    """Export selected articles to PDF."""
-    try:
-        selected_indices = st.session_state.export_selection
-        selected_articles = [filtered_articles[idx] for idx in selected_indices]
-
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            temp_path = tmp_file.name
-
-        # Export to PDF
-        with st.spinner('Generating PDF...'):
-            exporter = MultiArticlePDFExporter()
-            success = exporter.export_articles_to_pdf(selected_articles, temp_path)
-
-        if success:
-            # Read the PDF file
-            with open(temp_path, 'rb') as pdf_file:
-                pdf_data = pdf_file.read()
-
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            # Extract publishers from selected articles
-            publishers = {
-                get_source_name(article.get('url', '')).replace(' ', '_')
-                for article in selected_articles
-                if article.get('url')
-            }
-            publishers.discard('')
-
-            # Create filename based on publishers
-            if len(publishers) == 1:
-                publisher_name = list(publishers)[0]
-                filename = f"content_inspiration_{publisher_name}_{timestamp}.pdf"
-            else:
-                filename = f"content_inspiration_articles_{timestamp}.pdf"
-
-            # Provide download button
-            st.download_button(
-                label="Download PDF",
-                data=pdf_data,
-                file_name=filename,
-                mime="application/pdf",
-                icon=":material/download:",
-                use_container_width=True
-            )
 
-            st.success(f"Exported {len(selected_articles)} articles.")
+def export_filename(articles):
+    """Name the PDF after the publisher when every article comes from the same one."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-            # Clean up temp file
-            os.unlink(temp_path)
-        else:
-            st.error("Failed to export articles. Check logs for details.")
+    # Extract publishers from selected articles
+    publishers = {
+        get_source_name(article.get('url', '')).replace(' ', '_')
+        for article in articles
+        if article.get('url')
+    }
+    publishers.discard('')
 
+    if len(publishers) == 1:
+        return f"content_inspiration_{list(publishers)[0]}_{timestamp}.pdf"
+    return f"content_inspiration_articles_{timestamp}.pdf"
+
+
+def export_selected_articles(articles):
+    """Start rendering the selected articles to PDF in the background, in library order."""
+    try:
+        # Cards carry the url the filename needs; the export worker loads the bodies
+        selected_articles = [
+            article for article in articles
+            if article['_file_path'] in st.session_state.export_selection
+        ]
+        st.session_state.pdf_export = {
+            'future': submit_export([article['_file_path'] for article in selected_articles]),
+            'filename': export_filename(selected_articles),
+        }
     except Exception as e:
         st.error(f"Export error: {str(e)}")
 
 
+def render_export_status():
+    """Show progress of the background PDF export, then its download button."""
+    export = st.session_state.get('pdf_export')
+    future = export['future']
+    if not future.done():
+        st.caption(":material/hourglass_top: Generating PDF...")
+        return
+    if export['polling']:
+        # Rerun the whole app once so the finished export stops polling
+        export['polling'] = False
+        st.rerun()
+
+    try:
+        pdf_data, stats = future.result()
+    except Exception as e:
+        st.error(f"Failed to export articles: {e}")
+        return
+
+    st.download_button(
+        label="Download PDF",
+        data=pdf_data,
+        file_name=export['filename'],
+        mime="application/pdf",
+        icon=":material/download:",
+        use_container_width=True
+    )
+    st.success(
+        f"Exported {stats['articles']} articles in {stats['render_ms'] / 1000:.1f}s "
+        f"({stats['cached']} reused from cache)."
+    )
+
+
+def render_llm_metrics_panel():
+    """Show summarization latency and throughput per model and per run."""
+    with st.expander("Model performance", icon=":material/speed:"):
+        summary = get_llm_metrics().summary()
+        if not summary['models']:
+            st.caption("No summarization runs recorded yet.")
+            return
+
+        columns = {
+            'calls': 'Calls',
+            'p50_latency_s': 'p50 (s)',
+            'p95_latency_s': 'p95 (s)',
+            'tokens_per_s': 'Tokens/s',
+            'prompt_tokens_per_s': 'Prompt tokens/s',
+            'load_overhead': 'Load share',
+        }
+
+        st.caption("Per model")
+        models_df = pd.DataFrame.from_dict(summary['models'], orient='index')
+        st.dataframe(models_df[list(columns)].rename(columns=columns), use_container_width=True)
+
+        st.caption("Recent runs")
+        runs_df = pd.DataFrame.from_dict(summary['runs'], orient='index').tail(5).iloc[::-1]
+        st.dataframe(runs_df[['model', *columns]].rename(columns={'model': 'Model', **columns}),
+                     use_container_width=True)
+
+
+def semantic_search(query):
+    """Rank articles by embedding similarity; the best-matching paragraph is the snippet."""
+    hits = get_embedding_store().search(OllamaEmbedder(), query)
+    if not hits:
+        st.caption("No embeddings yet. They are built when new articles are fetched.")
+    for hit in hits:
+        snippet = ''
+        if hit['section'] >= 0:
+            try:
+                section = load_article_body(hit['file_path'])['sections'][hit['section']]
+                paragraph = section['paragraphs'][hit['paragraph']]
+                snippet = paragraph.get('original', '') if isinstance(paragraph, dict) else str(paragraph)
+            except (OSError, ValueError, KeyError, IndexError):
+                pass
+        snippet = ' '.join(snippet.split())
+        hit['snippet'] = snippet[:200] + '…' if len(snippet) > 200 else snippet
+    return hits
+
+
 def render_sidebar(articles, filtered_articles):
     """Render filters and search in the sidebar; return the filtered list."""
     with st.sidebar:
         st.subheader("Filters")
 
-        # Date range filter
-        dates = [
-            parse_date(article.get('published_date'))
-            for article in articles
-            if article.get('published_date')
-        ]
-        dates = sorted([d for d in dates if d != datetime.min])
+        # Date range filter: cards arrive sorted newest first with ISO dates
+        # precomputed at ingest, so the range is two bisects on an ascending array
+        ascending = filtered_articles[::-1]
+        iso_dates = [article.get('published_iso', '') for article in ascending]
+        date_options = sorted({iso for iso in iso_dates if iso})
 
-        if dates:
-            # Convert datetime objects to strings for display
-            date_strings = [d.strftime('%B %d, %Y') for d in dates]
-            date_range = st.select_slider(
+        if date_options:
+            start_date, end_date = st.select_slider(
                 "Date range",
-                options=date_strings,
-                value=(date_strings[0], date_strings[-1])
+                options=date_options,
+                value=(date_options[0], date_options[-1]),
+                format_func=format_iso_date
             )
 
-            # Convert selected strings back to datetime for filtering
-            start_date = datetime.strptime(date_range[0], '%B %d, %Y')
-            end_date = datetime.strptime(date_range[1], '%B %d, %Y')
-
             # Apply date filter
-            filtered_articles = [
-                article for article in filtered_articles
-                if start_date <= parse_date(article.get('published_date', '')) <= end_date
-            ]
+            start_idx = bisect.bisect_left(iso_dates, start_date)
+            end_idx = bisect.bisect_right(iso_dates, end_date)
+            filtered_articles = ascending[start_idx:end_idx][::-1]
 
         search_title = st.text_input(
             "Search in title", key="search_title",
@@ -430,7 +527,12 @@ def render_sidebar(articles, filtered_articles):
         )
         search_content = st.text_input(
             "Search in content", key="search_content",
-            placeholder="e.g. reinforcement learning", icon=":material/manage_search:"
+            placeholder='e.g. "reinforcement learning"', icon=":material/manage_search:",
+            help='Ranked full-text search. Use double quotes for exact phrases.'
+        )
+        semantic = st.toggle(
+            "Semantic search", key="semantic_search",
+            help="Match by meaning using embeddings instead of exact words."
         )
 
         if search_title:
@@ -438,31 +540,53 @@ def render_sidebar(articles, filtered_articles):
                 article for article in filtered_articles
                 if any(
                     search_title.lower() in title.lower()
-                    for title in [
-                        article.get('title', ''),
-                        *[section.get('section_title', '') for section in article.get('sections', [])]
-                    ]
+                    for title in [article.get('title', ''), *article.get('section_titles', [])]
                 )
             ]
 
         if search_content:
+            # Ranked search; results keep the ranking order and carry a snippet
+            try:
+                if semantic:
+                    hits = semantic_search(search_content)
+                else:
+                    hits = get_library_index().search(search_content)
+            except Exception as e:
+                st.error(f"Search failed: {e}")
+                hits = []
+            by_path = {article['_file_path']: article for article in filtered_articles}
             filtered_articles = [
-                article for article in filtered_articles
-                if any(
-                    search_content.lower() in text.lower()
-                    for section in article.get('sections', [])
-                    for text in section.get('paragraphs', [])
-                )
+                {**by_path[hit['file_path']], '_snippet': hit['snippet']}
+                for hit in hits
+                if hit['file_path'] in by_path
             ]
 
         st.caption(f"{len(filtered_articles)} matching articles")
+        index_stats = get_library_index().last_stats
+        st.caption(
+            f"{index_stats['articles']} articles indexed · "
+            f"synced in {index_stats['sync_ms']:.0f} ms, {index_stats['reindexed']} re-read"
+        )
+        cache_stats = get_article_cache().snapshot()
+        st.caption(
+            f"{cache_stats['articles']} articles cached ({cache_stats['bytes'] / 1024 / 1024:.1f} MB) · "
+            f"{cache_stats['hits']} hits, {cache_stats['reloaded']} read in {cache_stats['load_ms']:.0f} ms"
+        )
         st.divider()
-        create_export_section(filtered_articles)
+        create_export_section(articles, filtered_articles)
+        render_llm_metrics_panel()
 
     return filtered_articles
 
 
-def render_article_card(article, idx):
+def toggle_read_status(article_id, widget_key):
+    """Persist a read toggle before the rerun renders the cards."""
+    is_read = st.session_state[widget_key]
+    set_read_status(article_id, is_read)
+    st.session_state.read_articles[article_id] = is_read
+
+
+def render_article_card(article, idx, active_version=None):
     """Render one article as a card in the library list."""
     title = article.get('title', 'Untitled')
     date = article.get('published_date', '')
@@ -475,13 +599,18 @@ def render_article_card(article, idx):
 
         with cols[0]:
             if st.button(title, key=f"btn_{idx}", type="tertiary"):
-                st.session_state.selected_articles = {idx}
+                st.session_state.selected_articles = {article_id}
                 st.rerun()
-            source = get_source_name(url)
+            source = article.get('source') or get_source_name(url)
             meta_parts = [p for p in (source, date) if p]
             if not is_read:
                 meta_parts.append(":orange[Unread]")
             st.caption("  ·  ".join(meta_parts))
+            if article.get('_snippet'):
+                st.caption(article['_snippet'])
+            tldr = article_tldr(article, active_version)
+            if tldr:
+                st.markdown(f"<div class='card-tldr'>{html.escape(tldr)}</div>", unsafe_allow_html=True)
 
         with cols[1]:
             if url:
@@ -493,40 +622,80 @@ def render_article_card(article, idx):
                 )
 
         with cols[2]:
-            read_state = st.toggle("Read", value=is_read, key=f"read_{idx}", help="Mark as read")
-            st.session_state.read_articles[article_id] = read_state
+            # Only a real toggle touches the store; plain reruns write nothing
+            st.toggle("Read", value=is_read, key=f"read_{idx}", help="Mark as read",
+                      on_change=toggle_read_status, args=(article_id, f"read_{idx}"))
+
+
+def apply_library_table_edits(articles):
+    """Open the article or persist the read state the user ticked in the compact list."""
+    edits = st.session_state.library_table.get('edited_rows', {})
+    for row, changes in edits.items():
+        article_id = articles[int(row)]['_file_path']
+        if 'Read' in changes:
+            set_read_status(article_id, changes['Read'])
+            st.session_state.read_articles[article_id] = changes['Read']
+        if changes.get('Open'):
+            st.session_state.selected_articles = {article_id}
+
+
+def render_library_table(articles, active_version=None):
+    """Render the library as one sortable table instead of one card per article."""
+    read_articles = st.session_state.read_articles
+    table = pd.DataFrame({
+        'Open': False,
+        'Read': [read_articles.get(article['_file_path'], False) for article in articles],
+        'Title': [article.get('title', '') or 'Untitled' for article in articles],
+        'Source': [article.get('source', '') for article in articles],
+        'Published': [article.get('published_iso', '') for article in articles],
+        'TL;DR': [article_tldr(article, active_version) or '' for article in articles],
+    })
+    # Edits are applied in the callback; the changed data then gives the table a fresh state
+    st.data_editor(
+        table,
+        key="library_table",
+        hide_index=True,
+        use_container_width=True,
+        height=600,
+        disabled=['Title', 'Source', 'Published', 'TL;DR'],
+        column_config={
+            'Open': st.column_config.CheckboxColumn(width="small", help="Tick to open the article"),
+            'Read': st.column_config.CheckboxColumn(width="small", help="Mark as read"),
+            'Title': st.column_config.TextColumn(width="large"),
+            'TL;DR': st.column_config.TextColumn(width="large"),
+        },
+        on_change=apply_library_table_edits,
+        args=(articles,),
+    )
 
 
 def run_streamlit_app():
     st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
-    # Load articles and read status
-    articles = load_articles()
-
-    # Sort articles by date (newest first)
-    filtered_articles = sorted(
-        articles,
-        key=lambda x: parse_date(x.get('published_date', '')),
-        reverse=True  # Newest first
-    )
-
     # Initialize read status
     if 'read_articles' not in st.session_state:
         st.session_state.read_articles = load_read_status()
 
     # Check if we're viewing an article
-    selected_indices = st.session_state.get('selected_articles', set())
-    if selected_indices:
+    selected_paths = st.session_state.get('selected_articles', set())
+    if selected_paths:
         # Display single article view
         if st.button("Back to library", icon=":material/arrow_back:", type="tertiary"):
             st.session_state.selected_articles = set()
             st.rerun()
 
-        for idx in selected_indices:
-            article = filtered_articles[idx]
-            display_article(article)
+        for file_path in selected_paths:
+            try:
+                article = load_article_body(file_path)
+            except (OSError, ValueError) as e:
+                st.error(f"Could not open article: {e}")
+                continue
+            # Clicks inside the reader rerun only the reader, not the library load
+            st.fragment(display_article)(article)
     else:
-        filtered_articles = render_sidebar(articles, filtered_articles)
+        # Load article cards (already sorted newest first); the reader doesn't need them
+        articles = load_articles()
+        filtered_articles = render_sidebar(articles, articles)
 
         # Pagination setup with basic validation of YAML config
         articles_per_page = config.get('articles_per_page')
@@ -554,12 +723,32 @@ def run_streamlit_app():
             unsafe_allow_html=True
         )
 
+        compact = st.toggle("Compact list", key="compact_library",
+                            help="Show the whole library as one sortable table.")
+
         if not page_articles:
             st.info("No articles match the current filters. Try widening the date range or clearing the search.")
 
+        active_version = get_active_version()
+        if compact:
+            if filtered_articles:
+                render_library_table(filtered_articles, active_version)
+            return
+
         # Article cards
+        # Load the unread articles on this page and the next in the background while the user reads
+        prefetch_count = config.get('reader', {}).get('prefetch_unread', 3)
+        read_articles = st.session_state.read_articles
+        next_page = filtered_articles[end_idx:end_idx + articles_per_page]
+        likely = [
+            [article['_file_path'] for article in page if not read_articles.get(article['_file_path'], False)]
+            for page in (page_articles, next_page)
+        ]
+        get_prefetcher().prefetch(likely[0][:prefetch_count] + likely[1][:prefetch_count])
+
+        # Each card is a fragment, so toggling Read reruns only that card
         for relative_idx, article in enumerate(page_articles):
-            render_article_card(article, start_idx + relative_idx)
+            st.fragment(render_article_card)(article, start_idx + relative_idx, active_version)
 
         # Pagination
         if total_pages > 1:
@@ -578,6 +767,3 @@ def run_streamlit_app():
                              disabled=current_page >= total_pages, key="next_page_bottom"):
                     st.session_state.current_page = current_page + 1
                     st.rerun()
-
-    # Save read status at the end
-    save_read_status(st.session_state.read_articles)
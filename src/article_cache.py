@@ -0,0 +1,101 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+from src.utils.config import get_config
+from src.utils.logger import setup_logger
+
+logger = setup_logger('article_cache')
+config = get_config()
+
+DEFAULT_CACHE_MB = 64
+# Parsed article JSON takes roughly this many times its size on disk
+PARSED_SIZE_FACTOR = 2
+
+
+class ArticleCache:
+    """Process-wide cache of parsed article files, invalidated per file by mtime and size.
+
+    Shared by every Streamlit session, so a rerun only re-reads the files that
+    changed on disk since the previous load. Entries are evicted least
+    recently used first once their estimated size passes max_bytes.
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        if max_bytes is None:
+            max_bytes = config.get('reader', {}).get('article_cache_mb', DEFAULT_CACHE_MB) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._cached_bytes = 0
+        self._stats = {'hits': 0, 'reloaded': 0, 'load_ms': 0.0}
+
+    def _store(self, file_path: str, signature: tuple, article: Dict) -> tuple:
+        """Cache a parsed article as most recently used and evict the oldest entries over budget."""
+        self._drop(file_path)
+        cached = (signature, article, signature[1] * PARSED_SIZE_FACTOR)
+        self._entries[file_path] = cached
+        self._cached_bytes += cached[2]
+        while self._cached_bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+        return cached
+
+    def _drop(self, file_path: str):
+        cached = self._entries.pop(file_path, None)
+        if cached is not None:
+            self._cached_bytes -= cached[2]
+
+    def get(self, file_path: str) -> Dict:
+        """Return one article, re-reading it only if it changed since it was cached.
+
+        The caller gets its own copy, free to mutate without touching what
+        other sessions are served.
+        """
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._entries.get(file_path)
+            if cached is None or cached[0] != signature:
+                started_at = time.perf_counter()
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    article = json.load(f)
+                article['_file_path'] = file_path
+                cached = self._store(file_path, signature, article)
+                self._stats['reloaded'] += 1
+                self._stats['load_ms'] += (time.perf_counter() - started_at) * 1000
+            else:
+                self._entries.move_to_end(file_path)
+                self._stats['hits'] += 1
+            return copy.deepcopy(cached[1])
+
+    def snapshot(self) -> Dict:
+        """Return the cache's size and its hit and reload counts since startup."""
+        with self._lock:
+            return {
+                'articles': len(self._entries),
+                'bytes': self._cached_bytes,
+                **self._stats,
+                'load_ms': round(self._stats['load_ms'], 1),
+            }
+
+    def clear(self):
+        """Drop every cached article."""
+        with self._lock:
+            self._entries.clear()
+            self._cached_bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_article_cache() -> ArticleCache:
+    """Return the process-wide article cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArticleCache()
+        return _cache
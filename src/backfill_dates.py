@@ -0,0 +1,54 @@
+"""Normalize published_date to ISO in article files scraped before it was stored that way.
+
+The original string is kept in published_date_raw. Safe to run repeatedly.
+
+Usage:
+    python -m src.backfill_dates
+"""
+import json
+import os
+from src.summarizer import article_lock, write_article
+from src.utils.config import get_config
+from src.utils.dates import normalize_date
+from src.utils.logger import setup_logger
+
+logger = setup_logger('backfill_dates')
+config = get_config()
+
+
+def backfill_published_dates(articles_dir: str | None = None) -> dict:
+    """Rewrite articles that lack published_date_raw; return counts of updated and unparseable files."""
+    if articles_dir is None:
+        articles_dir = config['data_dir']
+    updated = 0
+    unparsed = 0
+
+    for filename in sorted(os.listdir(articles_dir)): # type: ignore
+        if not filename.endswith('.json'):
+            continue
+        file_path = os.path.join(articles_dir, filename) # type: ignore
+
+        try:
+            with article_lock(file_path):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    article = json.load(f)
+                if 'published_date_raw' in article:
+                    continue
+
+                raw = article.get('published_date', '')
+                article['published_date_raw'] = raw
+                article['published_date'] = normalize_date(raw)
+                if raw and not article['published_date']:
+                    logger.warning(f"Could not parse date '{raw}' in {filename}")
+                    unparsed += 1
+                write_article(file_path, article)
+                updated += 1
+        except Exception as e:
+            logger.error(f"Error backfilling {filename}: {str(e)}")
+
+    logger.info(f"Backfilled ISO dates in {updated} articles ({unparsed} unparseable)")
+    return {'updated': updated, 'unparsed': unparsed}
+
+
+if __name__ == '__main__':
+    print(json.dumps(backfill_published_dates(), indent=2))
@@ -0,0 +1,99 @@
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional
+from src.utils.summary_versions import paragraph_summary
+
+# Bump whenever the prompts below change so cached digests are rebuilt
+DIGEST_PROMPT_VERSION = "v1"
+
+SECTION_DIGEST_PROMPT = (
+    "Combine these summaries of the paragraphs in the section \"{title}\" "
+    "into one concise sentence:\n\n{summaries}"
+)
+TLDR_PROMPT = (
+    "Write a TL;DR of at most two sentences for the article \"{title}\" "
+    "based on these section digests:\n\n{digests}"
+)
+
+
+def _fingerprint(*parts) -> str:
+    payload = json.dumps([DIGEST_PROMPT_VERSION, *parts], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _section_inputs(section: Dict, version: str) -> List[str]:
+    summaries = (paragraph_summary(p, version) for p in section.get('paragraphs', []))
+    return [summary for summary in summaries if summary]
+
+
+def _section_fingerprints(article: Dict, version: str) -> List[str]:
+    return [
+        _fingerprint(section.get('section_title', ''), _section_inputs(section, version))
+        for section in article.get('sections', [])
+    ]
+
+
+def digest_is_current(article: Dict, version: str) -> bool:
+    """Check without any LLM call whether the cached digest matches the paragraph summaries."""
+    cached = article.get('digests', {}).get(version)
+    return bool(cached) and cached.get('fingerprint') == _fingerprint(*_section_fingerprints(article, version))
+
+
+def update_digest(article: Dict, version: str, generate: Callable[[str], str]) -> bool:
+    """Build or refresh the article's section digests and TL;DR for a summary version.
+
+    Map step: each section's paragraph summaries are combined into a digest.
+    Reduce step: the section digests are combined into the TL;DR. Only
+    sections whose summaries changed are regenerated, and single-summary
+    sections or single-section articles reuse the text without an LLM call.
+    Returns True if the article was changed.
+    """
+    if digest_is_current(article, version):
+        return False
+
+    cached = article.get('digests', {}).get(version, {})
+    cached_sections = {entry['fingerprint']: entry for entry in cached.get('sections', [])}
+
+    sections = []
+    for section, fingerprint in zip(article.get('sections', []), _section_fingerprints(article, version)):
+        if fingerprint in cached_sections:
+            sections.append(cached_sections[fingerprint])
+            continue
+
+        title = section.get('section_title', '')
+        summaries = _section_inputs(section, version)
+        if len(summaries) > 1:
+            text = generate(SECTION_DIGEST_PROMPT.format(
+                title=title,
+                summaries='\n'.join(f"- {summary}" for summary in summaries),
+            ))
+        else:
+            text = summaries[0] if summaries else ''
+        sections.append({'fingerprint': fingerprint, 'section_title': title, 'digest': text})
+
+    digests = [entry for entry in sections if entry['digest']]
+    if len(digests) > 1:
+        tldr = generate(TLDR_PROMPT.format(
+            title=article.get('title', ''),
+            digests='\n'.join(f"- {entry['section_title']}: {entry['digest']}" for entry in digests),
+        ))
+    else:
+        tldr = digests[0]['digest'] if digests else ''
+
+    article.setdefault('digests', {})[version] = {
+        'fingerprint': _fingerprint(*(entry['fingerprint'] for entry in sections)),
+        'sections': sections,
+        'tldr': tldr,
+    }
+    return True
+
+
+def article_tldr(article: Dict, version: str | None = None) -> Optional[str]:
+    """Return the TL;DR to show for an article, preferring the given version."""
+    digests = article.get('digests', {})
+    if version in digests:
+        return digests[version].get('tldr') or None
+    if digests:
+        # Oldest first, like paragraph_summary: a migration's new version waits for the switch
+        return next(iter(digests.values())).get('tldr') or None
+    return None
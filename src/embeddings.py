@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+import requests
+from src.utils.config import get_config
+from src.utils.logger import setup_logger
+
+logger = setup_logger('embeddings')
+config = get_config()
+
+# Longer paragraphs are cut before embedding; the start carries most of the topic
+MAX_EMBED_CHARS = 2000
+# Articles embedded between writes of rows.json during an update
+COMMIT_EVERY = 16
+
+
+class OllamaEmbedder:
+    """Client for the local Ollama embeddings endpoint."""
+
+    def __init__(self, model: str | None = None, base_url: str | None = None):
+        ollama_config = config.get('ollama', {})
+        self.model = model or ollama_config.get('embedding_model', 'nomic-embed-text')
+        base_url = base_url or ollama_config.get('base_url', 'http://localhost:11434')
+        self.api_url = f"{base_url.rstrip('/')}/api/embed"
+        self.timeout = ollama_config.get('timeout', 60)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts; returns an (n, dim) float32 matrix of unit vectors."""
+        response = requests.post(
+            self.api_url,
+            json={"model": self.model, "input": [text[:MAX_EMBED_CHARS] for text in texts]},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        vectors = np.asarray(response.json()['embeddings'], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def _article_texts(article: Dict) -> List[tuple]:
+    """Return (section index, paragraph index, text) for the title and every paragraph."""
+    texts = [(-1, -1, article.get('title', ''))]
+    for section_idx, section in enumerate(article.get('sections', [])):
+        for paragraph_idx, paragraph in enumerate(section.get('paragraphs', [])):
+            text = paragraph.get('original', '') if isinstance(paragraph, dict) else str(paragraph)
+            if text.strip():
+                texts.append((section_idx, paragraph_idx, text))
+    return texts
+
+
+def _fingerprint(texts: List[tuple]) -> str:
+    return hashlib.sha1(json.dumps([text for *_, text in texts]).encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only matrix of unit-length embeddings, memory-mapped for search.
+
+    vectors.f32 holds one float32 row per title or paragraph; rows.json maps
+    rows back to articles. Adding an article only appends rows. When an
+    article's text changes its old rows are marked dead and new ones are
+    appended, so existing rows never move.
+    """
+
+    def __init__(self, store_dir: str | None = None):
+        if store_dir is None:
+            store_dir = os.path.join(os.path.dirname(config['data_dir']), 'embeddings')
+        self.store_dir = store_dir
+        self.vectors_path = os.path.join(store_dir, 'vectors.f32')
+        self.rows_path = os.path.join(store_dir, 'rows.json')
+        # _lock guards the loaded state; _update_lock keeps updates from overlapping
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._loaded_mtime = None
+        self._meta = None
+        self._matrix = None
+        self._article_cache = None
+
+    def _empty_meta(self, model: str | None = None, dim: int = 0) -> Dict:
+        return {'model': model, 'dim': dim, 'rows': [], 'dead': [], 'articles': {}}
+
+    def _load(self):
+        """(Re)load row metadata and the memory map if the store changed on disk."""
+        try:
+            mtime = os.stat(self.rows_path).st_mtime_ns
+        except FileNotFoundError:
+            self._meta, self._matrix, self._loaded_mtime = self._empty_meta(), None, None
+            return
+        if mtime == self._loaded_mtime:
+            return
+
+        with open(self.rows_path, 'r', encoding='utf-8') as f:
+            self._meta = json.load(f)
+        count, dim = len(self._meta['rows']), self._meta['dim']
+        # Map only the rows rows.json knows about
+        self._matrix = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, dim))
+            if count and dim else None
+        )
+        self._loaded_mtime = mtime
+
+    def _save_meta(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{self.rows_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self.rows_path)
+
+    def update(self, embedder: OllamaEmbedder, articles_dir: str | None = None,
+               should_stop: Callable[[], bool] | None = None) -> Dict:
+        """Embed new or changed articles, reading only files whose mtime or size changed.
+
+        The embedding calls run without holding the store lock, so search()
+        and related() keep answering during a long backfill. Results are
+        committed every COMMIT_EVERY articles. If should_stop() becomes true,
+        the articles embedded so far are kept and the rest wait for the next update.
+        """
+        if articles_dir is None:
+            articles_dir = config['data_dir']
+        counts = {'embedded': 0, 'skipped': 0}
+
+        with self._update_lock:
+            with self._lock:
+                self._prepare(embedder)
+                known = {path: dict(entry) for path, entry in self._meta['articles'].items()}
+
+            pending = []
+            seen = set()
+            try:
+                for filename in sorted(os.listdir(articles_dir)):
+                    if not filename.endswith('.json'):
+                        continue
+                    if should_stop and should_stop():
+                        break
+                    file_path = os.path.join(articles_dir, filename) # type: ignore
+                    seen.add(file_path)
+                    result = self._embed_if_changed(embedder, file_path, known.get(file_path))
+                    if result is None:
+                        counts['skipped'] += 1
+                        continue
+                    pending.append(result)
+                    counts['embedded' if result[3] is not None else 'skipped'] += 1
+                    if len(pending) >= COMMIT_EVERY:
+                        self._commit(pending)
+                        pending = []
+            except requests.ConnectionError:
+                # The endpoint is down; keep what was embedded so far and stop
+                self._commit(pending)
+                raise
+            if should_stop and should_stop():
+                # Only a full pass knows which articles were deleted
+                self._commit(pending)
+            else:
+                # Articles deleted from disk drop out of search results
+                self._commit(pending, removed=set(known) - seen)
+
+        logger.info(f"Embedded {counts['embedded']} articles, {counts['skipped']} unchanged")
+        return counts
+
+    def _prepare(self, embedder: OllamaEmbedder):
+        """Load the store for an update, starting over if the embedding model changed."""
+        self._load()
+        meta = self._meta
+        if meta['model'] not in (None, embedder.model):
+            logger.info(f"Embedding model changed to {embedder.model}; rebuilding the store")
+            meta = self._empty_meta()
+            if os.path.exists(self.vectors_path):
+                os.remove(self.vectors_path)
+        meta['model'] = embedder.model
+
+        # Drop vectors left behind by an append that never made it into rows.json
+        expected_size = len(meta['rows']) * meta['dim'] * 4
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > expected_size:
+            os.truncate(self.vectors_path, expected_size)
+
+        self._meta = meta
+        self._save_meta()
+        self._loaded_mtime = None
+
+    def _embed_if_changed(self, embedder: OllamaEmbedder, file_path: str, entry: Optional[Dict]):
+        """Return (path, signature, fingerprint, texts, vectors) for a changed file, or None if unchanged.
+
+        texts and vectors are None when only the signature changed, not the embedded text.
+        """
+        stat = os.stat(file_path)
+        signature = [stat.st_mtime_ns, stat.st_size]
+        if entry and entry['signature'] == signature:
+            return None
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                texts = _article_texts(json.load(f))
+            fingerprint = _fingerprint(texts)
+            if entry and entry['fingerprint'] == fingerprint:
+                # Only summaries or metadata changed; the text we embed did not
+                return file_path, signature, fingerprint, None, None
+            return file_path, signature, fingerprint, texts, embedder.embed([text for *_, text in texts])
+        except requests.ConnectionError:
+            raise
+        except Exception as e:
+            logger.error(f"Error embedding {file_path}: {str(e)}")
+            return None
+
+    def _commit(self, pending: List[tuple], removed: Iterable[str] = ()):
+        """Append embedded rows and update row metadata under the store lock."""
+        with self._lock:
+            self._load()
+            meta = self._meta
+            for file_path, signature, fingerprint, texts, vectors in pending:
+                entry = meta['articles'].get(file_path)
+                if vectors is None:
+                    if entry:
+                        entry['signature'] = signature
+                    continue
+                if entry:
+                    meta['dead'].extend(range(*entry['rows']))
+                start = len(meta['rows'])
+                os.makedirs(self.store_dir, exist_ok=True)
+                with open(self.vectors_path, 'ab') as f:
+                    f.write(vectors.tobytes())
+                meta['dim'] = int(vectors.shape[1])
+                meta['rows'].extend([file_path, section, paragraph] for section, paragraph, _ in texts)
+                meta['articles'][file_path] = {
+                    'signature': signature,
+                    'fingerprint': fingerprint,
+                    'rows': [start, len(meta['rows'])],
+                }
+            for file_path in removed:
+                if file_path in meta['articles']:
+                    meta['dead'].extend(range(*meta['articles'].pop(file_path)['rows']))
+            self._save_meta()
+            self._loaded_mtime = None
+
+    def _alive_rows(self) -> np.ndarray:
+        alive = np.ones(len(self._meta['rows']), dtype=bool)
+        if self._meta['dead']:
+            alive[self._meta['dead']] = False
+        return alive
+
+    def _article_vectors(self):
+        """Mean of each article's unit rows, renormalized; returns (paths, matrix).
+
+        Cached until the store changes on disk.
+        """
+        if self._article_cache and self._article_cache[0] == self._loaded_mtime:
+            return self._article_cache[1], self._article_cache[2]
+
+        paths = list(self._meta['articles'])
+        if not paths or self._matrix is None:
+            return [], None
+        vectors = np.stack([
+            self._matrix[slice(*self._meta['articles'][path]['rows'])].mean(axis=0)
+            for path in paths
+        ])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        self._article_cache = (self._loaded_mtime, paths, vectors)
+        return paths, vectors
+
+    def search(self, embedder: OllamaEmbedder, query: str, limit: int = 30) -> List[Dict]:
+        """Rank articles by their best-matching title or paragraph (cosine similarity)."""
+        with self._lock:
+            self._load()
+            if self._matrix is None or self._meta['model'] != embedder.model:
+                return []
+        # Embedded without the lock, so a slow endpoint doesn't hold up other sessions
+        query_vector = embedder.embed([query])[0]
+        with self._lock:
+            self._load()
+            if self._matrix is None or self._meta['model'] != embedder.model:
+                return []
+            scores = np.asarray(self._matrix @ query_vector)
+            scores[~self._alive_rows()] = -np.inf
+
+            results = {}
+            for row in np.argsort(-scores):
+                if not np.isfinite(scores[row]) or len(results) >= limit:
+                    break
+                file_path, section, paragraph = self._meta['rows'][row]
+                if file_path not in results:
+                    results[file_path] = {
+                        'file_path': file_path,
+                        'score': float(scores[row]),
+                        'section': section,
+                        'paragraph': paragraph,
+                    }
+            return list(results.values())
+
+    def related(self, file_path: str, limit: int = 5) -> List[Dict]:
+        """Return the articles whose mean embedding is closest to this article's."""
+        with self._lock:
+            self._load()
+            paths, vectors = self._article_vectors()
+            if file_path not in paths:
+                return []
+            scores = vectors @ vectors[paths.index(file_path)]
+            ranked = [int(i) for i in np.argsort(-scores) if paths[i] != file_path][:limit]
+            return [{'file_path': paths[i], 'score': float(scores[i])} for i in ranked]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Return the process-wide embedding store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EmbeddingStore()
+        return _store
+
+
+def update_embeddings(articles_dir: str | None = None,
+                      should_stop: Callable[[], bool] | None = None) -> Optional[Dict]:
+    """Embed new articles into the store; returns None if the embeddings endpoint is unavailable."""
+    try:
+        return get_embedding_store().update(OllamaEmbedder(), articles_dir, should_stop)
+    except requests.RequestException as e:
+        logger.warning(f"Skipping embeddings, Ollama endpoint unavailable: {e}")
+        return None
@@ -1,18 +1,22 @@
 import os
 import json
+import time
 import requests
 import pandas as pd
-import glob
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List
 from src.utils.logger import setup_logger
 from dotenv import load_dotenv
 from src.utils.config import get_config
+from src.utils.links_csv import links_csv_lock
+from src.utils.metrics import get_metrics, timed
+from src.stage_status import get_stage_status
 
 # Setup module logger
 logger = setup_logger('image_downloader')
 
 config = get_config()
 CSV_FILE = './data/raw/google_ai_links.csv'
+IMAGES_STAGE = 'images'
 
 # Load environment variables
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
@@ -32,16 +36,18 @@ HEADERS = {
     'Connection': 'keep-alive',
 }
 
+@timed('links_csv_write')
 def update_download_status(article_url: str, status: bool):
     """Update the CSV file with image download status."""
     try:
-        df = pd.read_csv(CSV_FILE)
-        if 'images_downloaded' not in df.columns:
-            df['images_downloaded'] = False
-        
-        # Update status for the article
-        df.loc[df['url'] == article_url, 'images_downloaded'] = status
-        df.to_csv(CSV_FILE, index=False)
+        with links_csv_lock:
+            df = pd.read_csv(CSV_FILE)
+            if 'images_downloaded' not in df.columns:
+                df['images_downloaded'] = False
+
+            # Update status for the article
+            df.loc[df['url'] == article_url, 'images_downloaded'] = status
+            df.to_csv(CSV_FILE, index=False)
         logger.info(f"Updated download status for {article_url}: {status}")
     except Exception as e:
         logger.error(f"Failed to update CSV status: {str(e)}")
@@ -49,28 +55,30 @@ def update_download_status(article_url: str, status: bool):
 def check_if_downloaded(article_url: str) -> bool:
     """Check if article images were already downloaded and verify they exist."""
     try:
-        df = pd.read_csv(CSV_FILE)
-        if 'images_downloaded' not in df.columns:
-            df['images_downloaded'] = False
-            df.to_csv(CSV_FILE, index=False)
-            return False
-        
-        # Get the article's row
-        article_row = df.loc[df['url'] == article_url]
-        if article_row.empty:
-            return False
-            
-        # Reset status to False if it's NaN
-        if pd.isna(article_row['images_downloaded'].iloc[0]):
-            df.loc[df['url'] == article_url, 'images_downloaded'] = False
-            df.to_csv(CSV_FILE, index=False)
-            return False
-            
-        return bool(article_row['images_downloaded'].iloc[0])
+        with links_csv_lock:
+            df = pd.read_csv(CSV_FILE)
+            if 'images_downloaded' not in df.columns:
+                df['images_downloaded'] = False
+                df.to_csv(CSV_FILE, index=False)
+                return False
+
+            # Get the article's row
+            article_row = df.loc[df['url'] == article_url]
+            if article_row.empty:
+                return False
+
+            # Reset status to False if it's NaN
+            if pd.isna(article_row['images_downloaded'].iloc[0]):
+                df.loc[df['url'] == article_url, 'images_downloaded'] = False
+                df.to_csv(CSV_FILE, index=False)
+                return False
+
+            return bool(article_row['images_downloaded'].iloc[0])
     except Exception as e:
         logger.error(f"Failed to check download status: {str(e)}")
         return False
 
+@timed('fetch_and_save_image')
 def fetch_and_save_image(url: str, save_path: str) -> bool:
     """
     Fetch image from URL and save to specified path.
@@ -89,19 +97,25 @@ def fetch_and_save_image(url: str, save_path: str) -> bool:
         # Ensure directory exists
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         
+        size = 0
         with open(save_path, 'wb') as f:
             for chunk in response.iter_content(chunk_size=8192):
                 f.write(chunk)
+                size += len(chunk)
+        get_metrics().inc('image_bytes', size)
         logger.info(f"Successfully downloaded: {url} -> {save_path}")
         return True
     except requests.RequestException as e:
         logger.error(f"Network error downloading {url}: {str(e)}")
+        get_metrics().inc('images_failed')
         return False
     except IOError as e:
         logger.error(f"File error saving to {save_path}: {str(e)}")
+        get_metrics().inc('images_failed')
         return False
     except Exception as e:
         logger.error(f"Unexpected error downloading {url}: {str(e)}", exc_info=True)
+        get_metrics().inc('images_failed')
         return False
 
 def image_exists(img_path: str) -> bool:
@@ -116,6 +130,7 @@ def image_exists(img_path: str) -> bool:
 
 def process_article_images(json_path: str, images_root: str | None = None) -> Optional[Dict]:
     """Process and download images from a single article JSON file."""
+    started_at = time.perf_counter()
     try:
         if images_root is None:
             images_root = config.get('images_dir', 'images')
@@ -138,6 +153,7 @@ def process_article_images(json_path: str, images_root: str | None = None) -> Op
         # Only skip if both status is True and images exist
         if check_if_downloaded(article_url) and os.path.exists(article_dir) and os.listdir(article_dir):
             logger.info(f"Images already downloaded for {article_url}")
+            get_stage_status().mark_done(IMAGES_STAGE, json_path)
             return None
 
         # Process sections with images
@@ -151,6 +167,7 @@ def process_article_images(json_path: str, images_root: str | None = None) -> Op
         if not sections_with_images:
             logger.info(f"No images found in article {json_path}")
             update_download_status(article_url, True)
+            get_stage_status().mark_done(IMAGES_STAGE, json_path)
             return {
                 'article_index': article_index,
                 'downloads': [],
@@ -175,13 +192,13 @@ def process_article_images(json_path: str, images_root: str | None = None) -> Op
                 
                 if image_exists(img_path):
                     skipped_count += 1
-                    logger.debug(f"Skipped existing image: {img_path}")
+                    logger.debug("Skipped existing image: %s", img_path)
                     continue
 
                 success = fetch_and_save_image(img_url, img_path)
                 if success:
                     actual_downloads += 1
-                    logger.debug(f"Successfully downloaded: {img_path}")
+                    logger.debug("Successfully downloaded: %s", img_path)
                 all_successful &= success
                 
                 download_results.append({
@@ -193,7 +210,15 @@ def process_article_images(json_path: str, images_root: str | None = None) -> Op
 
         # Update CSV status and log results
         update_download_status(article_url, all_successful)
-        logger.info(f"Article {article_index}: Successfully downloaded {actual_downloads} new images, Skipped {skipped_count} existing images")
+        if all_successful:
+            # Failed downloads leave the article pending so the next run retries them
+            get_stage_status().mark_done(IMAGES_STAGE, json_path)
+        logger.info(
+            "Article %s: Successfully downloaded %d new images, Skipped %d existing images",
+            article_index, actual_downloads, skipped_count,
+            extra={'stage': 'images', 'article_id': article_index,
+                   'duration_ms': round((time.perf_counter() - started_at) * 1000, 1)},
+        )
         
         return {
             'article_index': article_index,
@@ -208,13 +233,16 @@ def process_article_images(json_path: str, images_root: str | None = None) -> Op
         return None
 
 def batch_process_articles(json_folder: str | None = None,
-                         images_root: str | None = None) -> List[Dict]:
+                         images_root: str | None = None,
+                         should_stop: Optional[Callable[[], bool]] = None) -> List[Dict]:
     """
-    Process all article JSON files in the specified folder.
+    Process the article JSON files in the specified folder whose images
+    haven't been fully downloaded since the file last changed.
     
     Args:
         json_folder: Directory containing article JSON files
         images_root: Root directory for saving images
+        should_stop: Checked before each article; returning True ends the batch early
     Returns:
         List[Dict]: Results of all download operations
     """
@@ -224,16 +252,19 @@ def batch_process_articles(json_folder: str | None = None,
         if images_root is None:
             images_root = config.get('images_dir', './images')
         os.makedirs(images_root, exist_ok=True) # type: ignore
-        json_files = glob.glob(os.path.join(json_folder, '*.json')) # type: ignore
-        
+        json_files, skipped = get_stage_status().pending(IMAGES_STAGE, json_folder) # type: ignore
+
         if not json_files:
-            logger.warning(f"No JSON files found in {json_folder}")
+            logger.info(f"No articles in {json_folder} need images ({skipped} skipped unread)")
             return []
 
-        logger.info(f"Found {len(json_files)} articles to process")
+        logger.info(f"Found {len(json_files)} articles to process, {skipped} skipped unread")
         results = []
         
         for json_file in json_files:
+            if should_stop and should_stop():
+                logger.info("Image downloads stopped before all articles were processed")
+                break
             logger.info(f"Processing article: {json_file}")
             result = process_article_images(json_file, images_root)
             if result:
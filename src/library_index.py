@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List
+from src import search_index
+from src.utils.config import get_config
+from src.utils.dates import display_date, normalize_date
+from src.utils.logger import setup_logger
+from src.utils.sources import get_source_name
+
+logger = setup_logger('library_index')
+config = get_config()
+
+# Bump when the tables change; the index is derived data and is rebuilt on mismatch
+SCHEMA_VERSION = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    file_path TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    author TEXT NOT NULL,
+    published_date TEXT NOT NULL,
+    published_iso TEXT NOT NULL,
+    section_titles TEXT NOT NULL,
+    tldrs TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+DATE_INDEX = "CREATE INDEX IF NOT EXISTS articles_published_iso ON articles (published_iso)"
+
+
+class LibraryIndex:
+    """Compact SQLite index of the fields the library view needs.
+
+    The ingest pipeline upserts a row whenever it writes an article file, and
+    sync() picks up files changed outside the pipeline, so the library can be
+    rendered without loading any article bodies.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(config['data_dir']), 'library.db')
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.last_stats = {'articles': 0, 'reindexed': 0, 'sync_ms': 0.0}
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # Drop the old layout; the next sync re-reads every article
+                for table in ('articles', 'articles_fts', 'articles_prefix', 'articles_fts_docs'):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute(SCHEMA)
+            conn.execute(DATE_INDEX)
+            search_index.create_schema(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row(file_path: str, article: Dict, stat: os.stat_result) -> tuple:
+        tldrs = {
+            version: digest.get('tldr', '')
+            for version, digest in article.get('digests', {}).items()
+        }
+        return (
+            file_path,
+            article.get('title', ''),
+            article.get('url', ''),
+            get_source_name(article.get('url', '')),
+            article.get('author', ''),
+            display_date(article),
+            # Normalizing again covers files written before dates were stored as ISO
+            normalize_date(article.get('published_date', '')),
+            json.dumps([section.get('section_title', '') for section in article.get('sections', [])],
+                       ensure_ascii=False),
+            json.dumps(tldrs, ensure_ascii=False),
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+
+    def upsert(self, file_path: str, article: Dict):
+        """Index an article that was just written to file_path."""
+        row = self._row(file_path, article, os.stat(file_path))
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            search_index.index_article(conn, file_path, article)
+
+    def sync(self, articles_dir: str | None = None) -> Dict:
+        """Bring the index in line with the article directory, reading only changed files."""
+        if articles_dir is None:
+            articles_dir = config['data_dir']
+        started_at = time.perf_counter()
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            indexed = {
+                row['file_path']: (row['mtime_ns'], row['size'])
+                for row in conn.execute("SELECT file_path, mtime_ns, size FROM articles")
+            }
+            seen = set()
+            rows = []
+            with os.scandir(articles_dir) as entries: # type: ignore
+                for entry in entries:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    file_path = os.path.join(articles_dir, entry.name) # type: ignore
+                    seen.add(file_path)
+                    stat = entry.stat()
+                    if indexed.get(file_path) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    try:
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            article = json.load(f)
+                    except (OSError, json.JSONDecodeError) as e:
+                        logger.error(f"Error indexing {file_path}: {e}")
+                        continue
+                    rows.append(self._row(file_path, article, stat))
+                    search_index.index_article(conn, file_path, article)
+
+            conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            removed = set(indexed) - seen
+            conn.executemany("DELETE FROM articles WHERE file_path = ?", [(path,) for path in removed])
+            for file_path in removed:
+                search_index.remove_article(conn, file_path)
+
+        self.last_stats = {
+            'articles': len(seen),
+            'reindexed': len(rows),
+            'sync_ms': round((time.perf_counter() - started_at) * 1000, 1),
+        }
+        return self.last_stats
+
+    def cards(self) -> List[Dict]:
+        """Return card data for every article, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT file_path, title, url, source, author, published_date, published_iso, "
+                "section_titles, tldrs FROM articles ORDER BY published_iso DESC, file_path"
+            ).fetchall()
+
+        return [
+            {
+                '_file_path': row['file_path'],
+                'title': row['title'],
+                'url': row['url'],
+                'source': row['source'],
+                'author': row['author'],
+                'published_date': row['published_date'],
+                'published_iso': row['published_iso'],
+                'section_titles': json.loads(row['section_titles']),
+                # Same shape as the article's 'digests' so article_tldr() works on cards
+                'digests': {version: {'tldr': tldr} for version, tldr in json.loads(row['tldrs']).items()},
+            }
+            for row in rows
+        ]
+
+    def search(self, text: str, limit: int = 200) -> List[Dict]:
+        """Full-text search over titles, section titles, paragraphs and summaries (BM25-ranked)."""
+        with closing(self._connect()) as conn:
+            return search_index.search(conn, text, limit)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_library_index() -> LibraryIndex:
+    """Return the process-wide library index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LibraryIndex()
+        return _index
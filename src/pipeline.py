@@ -0,0 +1,476 @@
+"""Run the ingestion pipeline (scrape, images, summaries, embeddings) as a background job.
+
+New articles stream through the stages one by one (see stream_new_articles),
+so each becomes readable as soon as its own summary is done.
+
+The job runs on a server-owned thread, so it doesn't block the Streamlit
+session that started it and survives page reloads. Progress is written to
+data/processed/pipeline_job.json for any session to poll. A lock file keeps
+two sessions or replicas from starting overlapping runs, and cancellation
+is requested through a marker file that the running job checks between
+articles.
+
+The same job runs headless from cron or systemd, sharing the lock and
+progress file with the UI:
+    python -m src.pipeline [--stages homepage,articles,images,summaries,embeddings]
+                           [--fetch-workers N] [--image-workers N] [--summary-workers N]
+                           [--time-budget SECONDS]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+from src.utils.config import get_config
+from src.utils.logger import setup_logger
+from src.utils.metrics import get_metrics
+
+logger = setup_logger('pipeline')
+config = get_config()
+
+STEPS = ("Scraping homepage", "Processing new articles", "Catching up older articles")
+
+# A running job touches its lock every HEARTBEAT_SECONDS from a timer thread, so
+# a lock untouched for STALE_LOCK_SECONDS is left over from a crash. That holds
+# even when a restarted process happens to get the crashed owner's pid back
+HEARTBEAT_SECONDS = 60
+STALE_LOCK_SECONDS = 3 * HEARTBEAT_SECONDS
+
+ALL_STAGES = ('homepage', 'articles', 'images', 'summaries', 'embeddings')
+
+# Threads per stage; fetches are still spaced by the scraper's rate limit and
+# summaries default to one at a time because a local Ollama serves one request well
+DEFAULT_WORKERS = {'fetch': 4, 'images': 4, 'summaries': 1}
+
+
+class PipelineCancelled(Exception):
+    """Raised inside the job when a cancellation was requested."""
+
+
+def stream_new_articles(report: Callable[..., None],
+                        should_stop: Callable[[], bool],
+                        workers: Dict | None = None,
+                        stages: Tuple[str, ...] = ALL_STAGES) -> Dict:
+    """Take each unscraped link through fetch, save, images and summary on its own.
+
+    Every stage has its own bounded thread pool and an article moves to the
+    next stage as soon as it finishes the previous one, so the first article
+    is readable after one article's latency rather than after the whole batch.
+    Saving (which assigns the file index) and marking the CSV happen on this
+    coordinating thread, one article at a time. Images and summaries only
+    run if they are among the selected stages.
+    """
+    from src.websites.google_ai_article_scraper import fetch_article, mark_link_checked, pending_links, save_article
+    from src.image_downloader import process_article_images
+    from src.summarizer import ArticleSummarizer, summarize_article_file
+
+    workers = {**DEFAULT_WORKERS, **config.get('pipeline', {}).get('workers', {}), **(workers or {})}
+    links = pending_links()
+    counts = {'processed_articles': 0, 'images_downloaded': 0, 'summaries_generated': 0}
+    if not links:
+        logger.info("No new articles to process")
+        return counts
+
+    started_at = time.perf_counter()
+    summarizer_lock = threading.Lock()
+    summarizer_holder = {}
+
+    def summarize(file_path):
+        # The first article to reach this stage starts Ollama; later ones reuse it
+        with summarizer_lock:
+            if 'summarizer' not in summarizer_holder:
+                try:
+                    summarizer_holder['summarizer'] = ArticleSummarizer()
+                except (ConnectionError, ValueError) as e:
+                    logger.warning(f"Summaries skipped for new articles, Ollama unavailable: {e}")
+                    summarizer_holder['summarizer'] = None
+        summarizer = summarizer_holder['summarizer']
+        return summarizer is not None and summarize_article_file(summarizer, file_path)
+
+    fetch_pool = ThreadPoolExecutor(max_workers=workers['fetch'], thread_name_prefix='fetch')
+    image_pool = ThreadPoolExecutor(max_workers=workers['images'], thread_name_prefix='images')
+    summary_pool = ThreadPoolExecutor(max_workers=workers['summaries'], thread_name_prefix='summaries')
+    stage_work = {'images': (image_pool, process_article_images), 'summaries': (summary_pool, summarize)}
+    chain = [stage for stage in ('images', 'summaries') if stage in stages]
+    pending = {fetch_pool.submit(fetch_article, url): ('fetch', idx) for idx, url in links}
+    finished = 0
+    cancelled = False
+
+    def advance(stage, file_path):
+        """Hand the article to the next selected stage; returns False when it has none left."""
+        position = chain.index(stage) + 1 if stage in chain else 0
+        if cancelled or position >= len(chain):
+            return False
+        pool, work = stage_work[chain[position]]
+        pending[pool.submit(work, file_path)] = (chain[position], file_path)
+        return True
+
+    try:
+        while pending:
+            # The timeout lets a cancel request land while every worker is busy
+            done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            if not cancelled and should_stop():
+                # Drop work that hasn't started; running articles finish their current stage
+                cancelled = True
+                for future in pending:
+                    future.cancel()
+
+            for future in done:
+                stage, key = pending.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error in {stage} stage for {key}: {str(e)}")
+                    result = None
+
+                file_path = key
+                if stage == 'fetch':
+                    file_path = save_article(result, key) if result else None
+                    if result:
+                        mark_link_checked(key)
+                    if not file_path:
+                        finished += 1
+                        continue
+                    counts['processed_articles'] += 1
+                elif stage == 'images' and result:
+                    counts['images_downloaded'] += result.get('new_downloads', 0)
+                elif stage == 'summaries' and result:
+                    counts['summaries_generated'] += 1
+
+                if not advance(stage, file_path):
+                    finished += 1
+                    if not cancelled and 'first_readable_s' not in counts:
+                        counts['first_readable_s'] = round(time.perf_counter() - started_at, 2)
+
+            # articles_saved lets the UI refresh the library as soon as an article lands
+            report(1, finished / len(links), f"{finished}/{len(links)} new articles done",
+                   articles_saved=counts['processed_articles'])
+    finally:
+        for pool in (fetch_pool, image_pool, summary_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
+        if summarizer_holder.get('summarizer'):
+            summarizer_holder['summarizer'].stop_server()
+
+    logger.info(f"Streamed {counts['processed_articles']} new articles in "
+                f"{time.perf_counter() - started_at:.1f}s")
+    if cancelled:
+        raise PipelineCancelled()
+    return counts
+
+
+def run_pipeline(report: Callable[..., None],
+                 should_stop: Callable[[], bool],
+                 stages: Tuple[str, ...] = ALL_STAGES,
+                 workers: Dict | None = None) -> Dict:
+    """Run the selected ingestion stages in order, reporting (step index, step progress, message)."""
+    # Imported here so the UI can show job status without loading the scrapers
+    from src.websites.google_ai_links_scraper import scrape_homepage
+    from src.image_downloader import IMAGES_STAGE, batch_process_articles
+    from src.summarizer import batch_process_articles as summarize_articles
+    from src.embeddings import update_embeddings
+    from src.stage_status import get_stage_status
+
+    def check_cancelled():
+        if should_stop():
+            raise PipelineCancelled()
+
+    counts = {'stages': list(stages), 'processed_articles': 0, 'images_downloaded': 0, 'summaries_generated': 0}
+
+    report(0, 0.0, STEPS[0])
+    if 'homepage' in stages:
+        counts['new_articles'] = len(scrape_homepage() or [])
+        check_cancelled()
+
+    report(1, 0.0, STEPS[1])
+    if 'articles' in stages:
+        for key, value in stream_new_articles(report, should_stop, workers, stages).items():
+            counts[key] = counts.get(key, 0) + value
+        check_cancelled()
+
+    # Older articles whose images or summaries failed on an earlier run
+    report(2, 0.0, STEPS[2])
+    if 'images' in stages:
+        results = batch_process_articles(should_stop=should_stop)
+        counts['images_downloaded'] += sum(r.get('new_downloads', 0) for r in results if r)
+        # Articles the stage had already finished and never opened
+        counts['images_skipped_unread'] = get_stage_status().last_stats.get(IMAGES_STAGE, {}).get('skipped', 0)
+        check_cancelled()
+    if 'summaries' in stages:
+        report(2, 0.5, "Summarizing remaining articles")
+        summary_results = summarize_articles(should_stop=should_stop)
+        counts['summaries_generated'] += summary_results['processed']
+        counts['summaries_skipped_unread'] = summary_results['unread']
+        check_cancelled()
+    if 'embeddings' in stages:
+        report(2, 0.9, "Embedding articles for semantic search")
+        embedding_results = update_embeddings(should_stop=should_stop)
+        if embedding_results is None:
+            report(2, 1.0, "Embeddings endpoint unavailable; semantic search will catch up next run")
+        else:
+            counts['articles_embedded'] = embedding_results['embedded']
+        check_cancelled()
+
+    return counts
+
+
+class PipelineJob:
+    """Background runner for the ingestion pipeline with persisted progress."""
+
+    def __init__(self, state_dir: str | None = None):
+        if state_dir is None:
+            state_dir = os.path.dirname(config['data_dir'])
+        self.state_path = os.path.join(state_dir, 'pipeline_job.json')
+        self.lock_path = os.path.join(state_dir, 'pipeline_job.lock')
+        self.cancel_path = os.path.join(state_dir, 'pipeline_job.cancel')
+        self._lock = threading.Lock()
+        self._thread = None
+        self._lock_owner = None
+
+    def _save_state(self, state: Dict):
+        # The UI thread (cancel) and the job thread (progress) both write the state
+        tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def status(self) -> Dict:
+        """Return the last persisted job state ({'status': 'idle'} if none ran yet)."""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'status': 'idle'}
+        if state.get('status') in ('running', 'cancelling') and not self._lock_is_live():
+            # The process running the job died without recording an outcome
+            state['status'] = 'interrupted'
+        return state
+
+    def is_running(self) -> bool:
+        return self.status()['status'] in ('running', 'cancelling')
+
+    def _read_lock(self) -> Optional[Dict]:
+        try:
+            with open(self.lock_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _lock_is_live(self) -> bool:
+        owner = self._read_lock()
+        if owner is None:
+            return False
+        if owner.get('host') == socket.gethostname():
+            # A dead owner on this host needn't wait out the heartbeat window
+            try:
+                os.kill(owner['pid'], 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+        try:
+            age = time.time() - os.stat(self.lock_path).st_mtime
+        except FileNotFoundError:
+            return False
+        return age < STALE_LOCK_SECONDS
+
+    def _acquire_lock(self) -> bool:
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        if os.path.exists(self.lock_path) and not self._lock_is_live():
+            logger.warning("Removing stale pipeline lock")
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        self._lock_owner = {'pid': os.getpid(), 'host': socket.gethostname(), 'acquired_at': time.time()}
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._lock_owner, f)
+        return True
+
+    def _release_lock(self):
+        """Remove the lock and cancel marker, unless another run has since taken the lock over."""
+        if self._read_lock() != self._lock_owner:
+            logger.warning("Pipeline lock is held by another run; leaving it in place")
+            return
+        for path in (self.cancel_path, self.lock_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _heartbeat(self, stopped: threading.Event):
+        """Touch the lock until the run ends, so other processes see it is live."""
+        while not stopped.wait(HEARTBEAT_SECONDS):
+            try:
+                os.utime(self.lock_path)
+            except FileNotFoundError:
+                return
+
+    def _begin(self) -> Optional[Dict]:
+        """Take the lock and record a fresh running state; None if another run holds the lock."""
+        if not self._acquire_lock():
+            return None
+        if os.path.exists(self.cancel_path):
+            os.remove(self.cancel_path)
+
+        state = {
+            'status': 'running',
+            'step': 0,
+            'total_steps': len(STEPS),
+            'progress': 0.0,
+            'message': 'Starting',
+            'pid': os.getpid(),
+            'started_at': time.time(),
+            'updated_at': time.time(),
+        }
+        self._save_state(state)
+        return state
+
+    def start(self, runner: Callable = run_pipeline) -> bool:
+        """Start the pipeline in the background; returns False if a run is already in progress."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return False
+            state = self._begin()
+            if state is None:
+                return False
+            self._thread = threading.Thread(target=self._run, args=(runner, state), daemon=True,
+                                            name='pipeline-job')
+            self._thread.start()
+            logger.info("Pipeline job started")
+            return True
+
+    def run(self, runner: Callable = run_pipeline, time_budget: float | None = None) -> Optional[Dict]:
+        """Run the pipeline on the calling thread; returns the final state, or None if locked.
+
+        With a time budget, the job stops like a cancellation once it runs out
+        and records status 'out_of_time'. Unfinished work is picked up next run.
+        """
+        with self._lock:
+            state = self._begin()
+        if state is None:
+            return None
+        deadline = time.monotonic() + time_budget if time_budget else None
+        self._run(runner, state, deadline)
+        return state
+
+    def cancel(self) -> bool:
+        """Ask the running job to stop after the article it is working on."""
+        if not self.is_running():
+            return False
+        with open(self.cancel_path, 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+        state = self.status()
+        state['status'] = 'cancelling'
+        self._save_state(state)
+        logger.info("Pipeline job cancellation requested")
+        return True
+
+    def _cancel_requested(self) -> bool:
+        return os.path.exists(self.cancel_path)
+
+    def _run(self, runner: Callable, state: Dict, deadline: float | None = None):
+        def should_stop() -> bool:
+            return self._cancel_requested() or (deadline is not None and time.monotonic() >= deadline)
+
+        def report(step: int, fraction: float, message: str, **fields):
+            state.update({
+                'step': step,
+                'progress': round((step + fraction) / len(STEPS), 3),
+                'message': message,
+                'updated_at': time.time(),
+                **fields,
+            })
+            if self._cancel_requested():
+                state['status'] = 'cancelling'
+            self._save_state(state)
+
+        heartbeat_stopped = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(heartbeat_stopped,), daemon=True,
+                         name='pipeline-heartbeat').start()
+        # Spans and counters from here on belong to this run's report
+        get_metrics().reset()
+        try:
+            state['results'] = runner(report, should_stop)
+            state.update({'status': 'complete', 'progress': 1.0, 'message': 'Done'})
+            logger.info(f"Pipeline job finished: {state['results']}")
+        except PipelineCancelled:
+            if self._cancel_requested():
+                state.update({'status': 'cancelled', 'message': 'Cancelled'})
+                logger.info("Pipeline job cancelled")
+            else:
+                state.update({'status': 'out_of_time', 'message': 'Time budget used up'})
+                logger.info("Pipeline job stopped at the end of its time budget")
+        except Exception as e:
+            logger.error(f"Error in pipeline job: {str(e)}", exc_info=True)
+            state.update({'status': 'failed', 'error': str(e)})
+        finally:
+            state['finished_at'] = time.time()
+            try:
+                state['metrics'] = get_metrics().write_run_report({
+                    key: state.get(key) for key in ('status', 'started_at', 'finished_at', 'results')
+                })
+            except OSError as e:
+                logger.warning(f"Could not write the run's metrics report: {e}")
+            self._save_state(state)
+            heartbeat_stopped.set()
+            self._release_lock()
+
+
+_job = None
+_job_lock = threading.Lock()
+
+
+def get_pipeline_job() -> PipelineJob:
+    """Return the process-wide pipeline job runner."""
+    global _job
+    with _job_lock:
+        if _job is None:
+            _job = PipelineJob()
+        return _job
+
+
+# Process exit codes for schedulers
+EXIT_CODES = {'complete': 0, 'failed': 1, 'locked': 2, 'cancelled': 3, 'out_of_time': 4}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the article ingestion pipeline without the UI.")
+    parser.add_argument('--stages', default=','.join(ALL_STAGES),
+                        help=f"Comma-separated stages to run (default: all of {','.join(ALL_STAGES)})")
+    parser.add_argument('--fetch-workers', type=int, help="Article pages fetched in parallel")
+    parser.add_argument('--image-workers', type=int, help="Articles downloading images in parallel")
+    parser.add_argument('--summary-workers', type=int, help="Articles summarized in parallel")
+    parser.add_argument('--time-budget', type=float,
+                        help="Seconds after which the run stops cleanly; the rest is left for the next run")
+    args = parser.parse_args()
+
+    stages = tuple(stage.strip() for stage in args.stages.split(',') if stage.strip())
+    unknown = set(stages) - set(ALL_STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    workers = {
+        stage: count for stage, count in (
+            ('fetch', args.fetch_workers), ('images', args.image_workers), ('summaries', args.summary_workers)
+        ) if count
+    }
+
+    state = get_pipeline_job().run(partial(run_pipeline, stages=stages, workers=workers), args.time_budget)
+    if state is None:
+        state = {'status': 'locked', 'message': 'Another pipeline run holds the lock'}
+    print(json.dumps(state, indent=2))
+    sys.exit(EXIT_CODES.get(state['status'], 1))
+
+
+if __name__ == '__main__':
+    main()
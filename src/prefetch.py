@@ -0,0 +1,69 @@
+import os
+import threading
+from typing import List
+from src.article_cache import get_article_cache
+from src.utils.images import display_image, get_local_image_path
+from src.utils.logger import setup_logger
+
+logger = setup_logger('prefetch')
+
+# Only the most likely articles are worth loading ahead; older requests are dropped
+MAX_PENDING = 16
+
+
+class Prefetcher:
+    """Loads articles the reader is likely to open next on a background thread.
+
+    Each library render replaces the pending list, so paging quickly never
+    builds up a backlog of articles the user already scrolled past. Bodies
+    land in the shared article cache, whose size cap bounds the memory used.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending: List[str] = []
+        self._thread = None
+        self.last_stats = {'prefetched': 0, 'failed': 0}
+
+    def prefetch(self, file_paths: List[str]):
+        """Replace the pending work with these articles, most likely first."""
+        with self._condition:
+            self._pending = list(dict.fromkeys(file_paths))[:MAX_PENDING]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                file_path = self._pending.pop(0)
+            try:
+                self._warm(file_path)
+                self.last_stats['prefetched'] += 1
+            except (OSError, ValueError) as e:
+                self.last_stats['failed'] += 1
+                logger.debug("Could not prefetch %s: %s", file_path, e)
+
+    def _warm(self, file_path: str):
+        """Load the article body and its display images, as opening it would."""
+        article = get_article_cache().get(file_path)
+        article_index = os.path.basename(file_path).split('_')[0]
+        for section_idx in range(len(article.get('sections', []))):
+            for image_path in get_local_image_path(article_index, section_idx + 1):
+                display_image(image_path)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Return the process-wide prefetcher."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        return _prefetcher
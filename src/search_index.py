@@ -0,0 +1,146 @@
+import re
+import sqlite3
+from typing import Dict, List
+
+# Column order matters: bm25() weights below follow it
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    file_path UNINDEXED,
+    title,
+    section_titles,
+    summaries,
+    body,
+    tokenize = 'porter unicode61 remove_diacritics 2',
+    prefix = '2 3 4'
+)
+"""
+COLUMN_WEIGHTS = (0.0, 10.0, 4.0, 2.0, 1.0)
+
+# Same columns without stemming: a partial word like "learni" is not a prefix
+# of its stem ("learn"), so the word being typed is matched here instead
+PREFIX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_prefix USING fts5(
+    file_path UNINDEXED,
+    title,
+    section_titles,
+    summaries,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3 4'
+)
+"""
+FTS_TABLES = ('articles_fts', 'articles_prefix')
+
+
+# Stable integer ids so updates address FTS rows by rowid instead of scanning file_path
+DOCS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles_fts_docs (
+    docid INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL UNIQUE
+)
+"""
+
+
+def create_schema(conn: sqlite3.Connection):
+    """Create the full-text tables if they don't exist."""
+    conn.execute(FTS_SCHEMA)
+    conn.execute(PREFIX_SCHEMA)
+    conn.execute(DOCS_SCHEMA)
+
+
+def _docid(conn: sqlite3.Connection, file_path: str) -> int:
+    conn.execute("INSERT OR IGNORE INTO articles_fts_docs (file_path) VALUES (?)", (file_path,))
+    return conn.execute("SELECT docid FROM articles_fts_docs WHERE file_path = ?", (file_path,)).fetchone()[0]
+
+
+def _document(article: Dict) -> tuple:
+    section_titles = []
+    summaries = []
+    body = []
+    for section in article.get('sections', []):
+        section_titles.append(section.get('section_title', ''))
+        for paragraph in section.get('paragraphs', []):
+            if isinstance(paragraph, dict):
+                body.append(paragraph.get('original', ''))
+                if 'summary' in paragraph:
+                    summaries.append(paragraph['summary'])
+                summaries.extend(paragraph.get('summaries', {}).values())
+            else:
+                body.append(str(paragraph))
+    return (
+        article.get('title', ''),
+        '\n'.join(section_titles),
+        '\n'.join(summaries),
+        '\n'.join(body),
+    )
+
+
+def index_article(conn: sqlite3.Connection, file_path: str, article: Dict):
+    """Replace the indexed text of one article."""
+    docid = _docid(conn, file_path)
+    document = _document(article)
+    for table in FTS_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (docid,))
+        conn.execute(
+            f"INSERT INTO {table} (rowid, file_path, title, section_titles, summaries, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (docid, file_path, *document),
+        )
+
+
+def remove_article(conn: sqlite3.Connection, file_path: str):
+    """Drop an article from the full-text index."""
+    row = conn.execute("SELECT docid FROM articles_fts_docs WHERE file_path = ?", (file_path,)).fetchone()
+    if row:
+        for table in FTS_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (row[0],))
+        conn.execute("DELETE FROM articles_fts_docs WHERE docid = ?", (row[0],))
+
+
+def build_query(text: str, prefix: bool = False) -> str:
+    """Turn free text into an FTS5 query.
+
+    Double-quoted parts become phrase queries and every other word must
+    match. With prefix, the last bare word (3+ characters) matches as a
+    prefix so results update while typing. Everything is quoted, so user
+    input can't produce syntax errors.
+    """
+    phrases = [phrase.strip() for phrase in re.findall(r'"([^"]*)"', text) if phrase.strip()]
+    words = re.findall(r'\w+', re.sub(r'"[^"]*"', ' ', text))
+
+    parts = [f'"{phrase}"' for phrase in phrases]
+    parts += [f'"{word}"' for word in words]
+    # Very short prefixes expand to most of the vocabulary, so only longer ones use it
+    if prefix:
+        if not words or len(words[-1]) < 3:
+            return ''
+        parts[-1] += '*'
+    return ' '.join(parts)
+
+
+def _match(conn: sqlite3.Connection, table: str, query: str, limit: int) -> List[tuple]:
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    return conn.execute(
+        f"SELECT file_path, bm25({table}, {weights}) AS score, "
+        f"snippet({table}, -1, '**', '**', '…', 16) AS snippet "
+        f"FROM {table} WHERE {table} MATCH ? ORDER BY score LIMIT ?",
+        (query, limit),
+    ).fetchall()
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = 200) -> List[Dict]:
+    """Return matching articles ranked by BM25, each with a highlighted snippet.
+
+    Whole words match stemmed ("models" finds "model"); the last word also
+    matches as an unstemmed prefix. An article found both ways keeps its
+    better score.
+    """
+    results = {}
+    for table, query in (('articles_fts', build_query(text)),
+                         ('articles_prefix', build_query(text, prefix=True))):
+        if not query:
+            continue
+        for file_path, score, snippet in _match(conn, table, query, limit):
+            if file_path not in results or -score > results[file_path]['score']:
+                results[file_path] = {'file_path': file_path, 'score': -score, 'snippet': ' '.join(snippet.split())}
+    return sorted(results.values(), key=lambda result: result['score'], reverse=True)[:limit]
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Tuple
+from src.utils.config import get_config
+from src.utils.logger import setup_logger
+
+logger = setup_logger('stage_status')
+config = get_config()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_status (
+    stage TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (stage, file_path)
+)
+"""
+
+
+class StageStatus:
+    """Records which article files each pipeline stage has finished, by mtime and size.
+
+    A stage asks pending() for the files it still has to visit. That is one
+    directory scan plus one query, so files the stage already finished are
+    skipped without being opened. Any write to an article file changes its
+    signature and sends it back through the stages that depend on it.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(config['data_dir']), 'stage_status.db')
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.last_stats: Dict[str, Dict] = {}
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def pending(self, stage: str, articles_dir: str) -> Tuple[List[str], int]:
+        """Return the article files the stage hasn't finished at their current version, and how many it skips."""
+        with closing(self._connect()) as conn:
+            done = {
+                file_path: (mtime_ns, size)
+                for file_path, mtime_ns, size in conn.execute(
+                    "SELECT file_path, mtime_ns, size FROM stage_status WHERE stage = ?", (stage,)
+                )
+            }
+
+        pending = []
+        seen = set()
+        with os.scandir(articles_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                file_path = os.path.join(articles_dir, entry.name)
+                seen.add(file_path)
+                stat = entry.stat()
+                if done.get(file_path) != (stat.st_mtime_ns, stat.st_size):
+                    pending.append(file_path)
+
+        # Forget files that were deleted since the stage last ran
+        removed = [(stage, file_path) for file_path in set(done) - seen]
+        if removed:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.executemany("DELETE FROM stage_status WHERE stage = ? AND file_path = ?", removed)
+
+        skipped = len(seen) - len(pending)
+        self.last_stats[stage] = {'pending': len(pending), 'skipped': skipped}
+        logger.info(f"Stage {stage}: {len(pending)} articles to visit, {skipped} skipped unread")
+        return sorted(pending), skipped
+
+    def mark_done(self, stage: str, file_path: str):
+        """Record that the stage finished the file as it is on disk now."""
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stage_status VALUES (?, ?, ?, ?, ?)",
+                (stage, file_path, stat.st_mtime_ns, stat.st_size, time.time()),
+            )
+
+
+_status = None
+_status_lock = threading.Lock()
+
+
+def get_stage_status() -> StageStatus:
+    """Return the process-wide stage status table."""
+    global _status
+    with _status_lock:
+        if _status is None:
+            _status = StageStatus()
+        return _status
@@ -1,21 +1,42 @@
 import json
 import os
-from typing import Dict
+from typing import Callable, Dict, Iterator
 import requests
+from src.digest import digest_is_current, update_digest
+from src.library_index import get_library_index
+from src.stage_status import get_stage_status
+from src.summary_queue import get_summary_queue
 from src.utils.logger import setup_logger
 from src.utils.config import get_config
+from src.utils.llm_metrics import get_llm_metrics
+from src.utils.metrics import get_metrics, timed
+from src.utils.summary_versions import has_summary
 import subprocess
+import threading
 import time
 
 logger = setup_logger('summarizer')
 config = get_config()
 
+PROMPT_TEMPLATE = "Summarize this paragraph concisely in 1-2 sentences:\n\n{paragraph}"
+# Bump whenever PROMPT_TEMPLATE changes so the library can be re-summarized
+PROMPT_VERSION = "v1"
+ERROR_SUMMARY = "Error generating summary"
+
+def summary_version(model: str | None = None) -> str:
+    """Key under which summaries from this model (default: configured) and prompt are stored."""
+    model = model or config.get('ollama', {}).get('model', 'mistral')
+    return f"{model}@{PROMPT_VERSION}"
+
 class ArticleSummarizer:
     def __init__(self, model: str | None = None):
         self.model = model or config.get('ollama', {}).get('model', 'mistral')
         base_url = config.get('ollama', {}).get('base_url', 'http://localhost:11434')
         self.timeout = config.get('ollama', {}).get('timeout', 60)
         self.api_url = f"{base_url.rstrip('/')}/api/generate"
+        self.version = summary_version(self.model)
+        # Each summarizer instance is one telemetry run
+        self.run_id = time.strftime('%Y%m%d-%H%M%S') + f"-{os.getpid()}"
         
         self.server_process = None
         self.started_server = False
@@ -105,26 +126,92 @@ class ArticleSummarizer:
         self.started_server = False
         self.server_running_before = False
 
+    def generate(self, prompt: str) -> str:
+        """Run one non-streaming completion and return its text; raises on failure."""
+        started_at = time.perf_counter()
+        response = requests.post(
+            self.api_url,
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        result = response.json()
+        self._record_metrics(result, time.perf_counter() - started_at)
+        return result['response'].strip()
+
+    @timed('summarize_paragraph')
     def summarize_paragraph(self, paragraph: str) -> str:
         """Generate a summary for a single paragraph using local Ollama model."""
-        prompt = f"Summarize this paragraph concisely in 1-2 sentences:\n\n{paragraph}"
+        prompt = PROMPT_TEMPLATE.format(paragraph=paragraph)
         
         try:
-            response = requests.post(
+            return self.generate(prompt)
+            
+        except Exception as e:
+            logger.error(f"Error generating summary: {str(e)}")
+            # The span only counts errors that propagate, and this one is swallowed
+            get_metrics().inc('summarize_paragraph_errors')
+            return ERROR_SUMMARY
+
+    def stream_paragraph(self, paragraph: str) -> Iterator[str]:
+        """Yield summary tokens for a paragraph as the Ollama model produces them.
+
+        A failure before the first token yields ERROR_SUMMARY. A failure after
+        it, or a stream that ends without Ollama's final chunk, raises, so a
+        truncated summary is never taken for a complete one.
+        """
+        prompt = PROMPT_TEMPLATE.format(paragraph=paragraph)
+        started = False
+        done = False
+
+        try:
+            started_at = time.perf_counter()
+            with requests.post(
                 self.api_url,
                 json={
                     "model": self.model,
                     "prompt": prompt,
-                    "stream": False
+                    "stream": True
                 },
                 timeout=self.timeout,
-            )
-            response.raise_for_status()
-            return response.json()['response'].strip()
-            
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    token = chunk.get('response', '')
+                    # Drop the leading whitespace the model tends to emit first
+                    if not started:
+                        token = token.lstrip()
+                    if token:
+                        started = True
+                        yield token
+                    if chunk.get('done'):
+                        # The final chunk carries the timing statistics
+                        self._record_metrics(chunk, time.perf_counter() - started_at)
+                        done = True
+                        break
+            if not done:
+                raise ConnectionError("Ollama closed the stream before the summary was finished")
+
         except Exception as e:
-            logger.error(f"Error generating summary: {str(e)}")
-            return "Error generating summary"
+            logger.error(f"Error streaming summary: {str(e)}")
+            if started:
+                raise
+            yield ERROR_SUMMARY
+
+    def _record_metrics(self, response: Dict, latency_s: float):
+        """Store Ollama's timing fields for this call; telemetry never breaks summarization."""
+        try:
+            get_llm_metrics().record(self.run_id, self.model, response, latency_s)
+        except Exception as e:
+            logger.warning(f"Could not record LLM metrics: {e}")
 
     def process_article(self, article_path: str) -> Dict:
         """Process a single article JSON file and generate summaries."""
@@ -151,11 +238,11 @@ class ArticleSummarizer:
                 for paragraph in section.get('paragraphs', []):
                     if paragraph.strip():
                         summary = self.summarize_paragraph(paragraph)
-                        logger.debug(f"Generated summary for paragraph: {summary[:100]}...")
+                        logger.debug("Generated summary for paragraph: %.100s...", summary)
                         
                         summarized_section['paragraphs'].append({
                             'original': paragraph,
-                            'summary': summary
+                            'summaries': {self.version: summary}
                         })
                 
                 summarized_article['sections'].append(summarized_section)
@@ -166,69 +253,230 @@ class ArticleSummarizer:
             logger.error(f"Error processing article {article_path}: {str(e)}")
             return {}
 
-def needs_summarization(article):
-    """Check if article needs to be summarized."""
+def needs_summarization(article, version: str | None = None):
+    """Check if article needs to be summarized.
+
+    Without a version, any existing summary counts; with one, every paragraph
+    must have a summary stored under that version.
+    """
     for section in article.get('sections', []):
         for paragraph in section.get('paragraphs', []):
-            if isinstance(paragraph, str):
-                return True
-            if isinstance(paragraph, dict) and 'summary' not in paragraph:
+            if not has_summary(paragraph, version):
                 return True
     return False
 
-def batch_process_articles(articles_dir: str | None = None):
-    """Process articles and add summaries only to those that need it."""
-    if articles_dir is None:
-        articles_dir = config['data_dir']
-    summarizer = ArticleSummarizer()
-    processed_count = 0
-    skipped_count = 0
-    
-    for filename in os.listdir(articles_dir):
-        if not filename.endswith('.json'):
-            continue
-            
-        file_path = os.path.join(articles_dir, filename) # type: ignore
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                article = json.load(f)
-            
-            # Skip if already summarized
-            if not needs_summarization(article):
-                logger.info(f"Skipping already summarized article: {filename}")
-                skipped_count += 1
+def write_article(file_path: str, article: Dict):
+    """Write an article back to disk, dropping runtime-only keys (prefixed with '_')."""
+    data = {key: value for key, value in article.items() if not key.startswith('_')}
+    # Readers (library sync, the article cache, prefetch) must never see half a file
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+    try:
+        get_library_index().upsert(file_path, data)
+    except Exception as e:
+        logger.warning(f"Could not update library index for {file_path}: {e}")
+
+def summary_stage(version: str | None = None) -> str:
+    """Name under which the stage status table tracks summaries for a version."""
+    return f"summaries:{version or summary_version()}"
+
+def _mark_summarized(file_path: str, article: Dict, version: str):
+    # Matches batch_process_articles' test, so a finished article isn't re-read next run
+    if not needs_summarization(article) and digest_is_current(article, version):
+        get_stage_status().mark_done(summary_stage(version), file_path)
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+def article_lock(file_path: str) -> threading.Lock:
+    """Return the lock serializing summary writers for one article file."""
+    with _file_locks_guard:
+        return _file_locks.setdefault(os.path.abspath(file_path), threading.Lock())
+
+def save_summaries(file_path: str, version: str, summaries: Dict[tuple, str], digest: Dict | None = None):
+    """Merge paragraph summaries, keyed by (section, paragraph) index, into the article on disk.
+
+    The file is re-read under the article lock, so summaries another writer
+    saved in the meantime are kept. The digest is stored only if it was
+    built from the same summaries as the merged article has.
+    """
+    with article_lock(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            article = json.load(f)
+        sections = article.get('sections', [])
+        for (section_idx, paragraph_idx), summary in summaries.items():
+            try:
+                paragraphs = sections[section_idx]['paragraphs']
+                paragraph = paragraphs[paragraph_idx]
+            except (IndexError, KeyError):
                 continue
-                
-            logger.info(f"Summarizing article: {filename}")
-            
+            if isinstance(paragraph, str):
+                paragraph = paragraphs[paragraph_idx] = {'original': paragraph}
+            paragraph.setdefault('summaries', {}).setdefault(version, summary)
+
+        if digest and not digest_is_current(article, version):
+            merged = {**article, 'digests': {**article.get('digests', {}), version: digest}}
+            if digest_is_current(merged, version):
+                article = merged
+
+        write_article(file_path, article)
+        _mark_summarized(file_path, article, version)
+
+def summarize_article_file(summarizer: ArticleSummarizer, file_path: str, resummarize: bool = False) -> bool:
+    """Add summaries and the article digest to one file in place; return False if nothing was needed.
+
+    With resummarize, paragraphs summarized under another model or prompt
+    version also get a summary for the summarizer's own version. Failed
+    paragraphs are left without one so a later run retries them.
+    """
+    target = summarizer.version if resummarize else None
+    started_at = time.perf_counter()
+
+    with article_lock(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            article = json.load(f)
+
+        needs_summaries = needs_summarization(article, target)
+        if not needs_summaries and digest_is_current(article, summarizer.version):
+            logger.info(f"Skipping already summarized article: {file_path}")
+            _mark_summarized(file_path, article, summarizer.version)
+            return False
+
+        if needs_summaries:
+            logger.info(f"Summarizing article: {file_path} ({summarizer.version})")
+
             # Process each section's paragraphs
             for section in article.get('sections', []):
                 summarized_paragraphs = []
                 for paragraph in section.get('paragraphs', []):
-                    if isinstance(paragraph, str):
-                        summary = summarizer.summarize_paragraph(paragraph)
-                        summarized_paragraphs.append({
-                            'original': paragraph,
-                            'summary': summary
-                        })
-                    else:
+                    if has_summary(paragraph, target):
                         # Keep existing paragraph structure
                         summarized_paragraphs.append(paragraph)
+                        continue
+
+                    if isinstance(paragraph, str):
+                        paragraph = {'original': paragraph}
+                    summary = summarizer.summarize_paragraph(paragraph.get('original', ''))
+                    if summary != ERROR_SUMMARY:
+                        paragraph.setdefault('summaries', {})[summarizer.version] = summary
+                    summarized_paragraphs.append(paragraph)
                 section['paragraphs'] = summarized_paragraphs
-            
-            # Save back to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(article, f, indent=2, ensure_ascii=False)
-                
-            logger.info(f"Successfully summarized {filename}")
-            processed_count += 1
-            
+
+        # Build the digest once every paragraph has a summary to compose it from
+        if not needs_summarization(article, target):
+            try:
+                update_digest(article, summarizer.version, summarizer.generate)
+            except Exception as e:
+                logger.error(f"Error building digest for {file_path}: {str(e)}")
+
+        # Save back to file
+        write_article(file_path, article)
+        _mark_summarized(file_path, article, summarizer.version)
+
+    logger.info(
+        "Successfully summarized %s", file_path,
+        extra={'stage': 'summaries', 'article_id': os.path.basename(file_path).split('_')[0],
+               'duration_ms': round((time.perf_counter() - started_at) * 1000, 1)},
+    )
+    return True
+
+def drain_summary_queue(summarizer: ArticleSummarizer | None = None,
+                        should_stop: Callable[[], bool] | None = None) -> int:
+    """Summarize queued articles in priority order until the queue is empty.
+
+    Starts (and afterwards stops) an ArticleSummarizer only if there is work.
+    If should_stop() becomes true the remaining articles stay queued.
+    Returns the number of articles that were summarized.
+    """
+    queue = get_summary_queue()
+    owns_summarizer = summarizer is None
+    processed_count = 0
+
+    try:
+        while not (should_stop and should_stop()) and (file_path := queue.pop()) is not None:
+            try:
+                if summarizer is None:
+                    summarizer = ArticleSummarizer()
+                if summarize_article_file(summarizer, file_path):
+                    processed_count += 1
+            except (ConnectionError, ValueError):
+                # Ollama is unavailable; leave the article queued for a later run
+                queue.release(file_path)
+                raise
+            except FileNotFoundError:
+                logger.warning(f"Queued article no longer exists: {file_path}")
+                queue.done(file_path)
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {str(e)}")
+                queue.done(file_path)
+            else:
+                queue.done(file_path)
+    finally:
+        if owns_summarizer and summarizer is not None:
+            summarizer.stop_server()
+
+    return processed_count
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def start_background_worker() -> bool:
+    """Drain the summary queue in a daemon thread; return False if one is already running."""
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return False
+
+        def run():
+            try:
+                processed = drain_summary_queue()
+                logger.info(f"Background summarizer finished: {processed} articles summarized")
+            except Exception as e:
+                logger.error(f"Background summarizer stopped: {str(e)}")
+
+        _worker = threading.Thread(target=run, name='summary-worker', daemon=True)
+        _worker.start()
+        return True
+
+def request_summary(file_path: str, published_date: str = ''):
+    """Move an article to the front of the queue and make sure a worker is draining it."""
+    get_summary_queue().push(file_path, published_date, requested=True)
+    start_background_worker()
+
+def batch_process_articles(articles_dir: str | None = None, should_stop: Callable[[], bool] | None = None):
+    """Queue every article that still needs summaries and drain the queue by priority."""
+    if articles_dir is None:
+        articles_dir = config['data_dir']
+    queue = get_summary_queue()
+    version = summary_version()
+    stage_status = get_stage_status()
+    # Articles summarized since they last changed are skipped without being opened
+    file_paths, unchanged_count = stage_status.pending(summary_stage(version), articles_dir) # type: ignore
+    skipped_count = 0
+
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                article = json.load(f)
+
+            if needs_summarization(article) or not digest_is_current(article, version):
+                queue.push(file_path, article.get('published_date', ''))
+            else:
+                _mark_summarized(file_path, article, version)
+                skipped_count += 1
+
         except Exception as e:
-            logger.error(f"Error processing {filename}: {str(e)}")
-            
-    summarizer.stop_server()
+            logger.error(f"Error processing {file_path}: {str(e)}")
+
+    logger.info(f"{len(queue)} articles queued for summarization, {skipped_count} already summarized, "
+                f"{unchanged_count} skipped unread")
+    processed_count = drain_summary_queue(should_stop=should_stop)
+
     return {
         'processed': processed_count,
-        'skipped': skipped_count
+        'skipped': skipped_count + unchanged_count,
+        'unread': unchanged_count
     }
@@ -0,0 +1,131 @@
+"""Re-summarize the library under a new model or prompt version.
+
+Old summaries keep being served until every article has the new version,
+then the reader switches over. Re-running resumes an interrupted job.
+
+Usage:
+    python -m src.summary_migration --workers 4 [--model llama3] [--no-activate]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict
+from src.summarizer import ArticleSummarizer, needs_summarization, summarize_article_file, summary_version
+from src.utils.config import get_config
+from src.utils.logger import setup_logger
+from src.utils.summary_versions import get_active_version, set_active_version
+
+logger = setup_logger('summary_migration')
+config = get_config()
+
+
+def get_state_path():
+    """Return the path of the file recording migration progress."""
+    return os.path.join(os.path.dirname(config['data_dir']), 'summary_migration.json')
+
+
+def save_state(state: Dict):
+    """Persist migration progress so the UI and later runs can see it."""
+    state_path = get_state_path()
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def pending_articles(articles_dir: str, version: str):
+    """List article files that still lack summaries for the given version."""
+    pending = []
+    for filename in sorted(os.listdir(articles_dir)):
+        if not filename.endswith('.json'):
+            continue
+        file_path = os.path.join(articles_dir, filename)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                article = json.load(f)
+            if needs_summarization(article, version):
+                pending.append(file_path)
+        except Exception as e:
+            logger.error(f"Error reading {file_path}: {str(e)}")
+    return pending
+
+
+def migrate_summaries(articles_dir: str | None = None, model: str | None = None,
+                      workers: int = 2, activate: bool = True) -> Dict:
+    """Summarize every article under the configured (or given) model's version.
+
+    Articles are processed in parallel. When nothing is left pending and
+    activate is set, the reader is switched to the new version atomically.
+    """
+    if articles_dir is None:
+        articles_dir = config['data_dir']
+
+    summarizer = ArticleSummarizer(model)
+    target = summarizer.version
+    previous = get_active_version()
+    if previous is None and summary_version() != target:
+        # Pin the reader to the version it serves now, so migrated articles don't switch one by one
+        previous = summary_version()
+        set_active_version(previous)
+    pending = pending_articles(articles_dir, target) # type: ignore
+    state = {
+        'target': target,
+        'previous': previous,
+        'started_at': time.time(),
+        'total': len(pending),
+        'completed': 0,
+        'failed': 0,
+        'status': 'running',
+    }
+    save_state(state)
+    logger.info(f"Migrating {len(pending)} articles to summary version {target} with {workers} workers")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = {
+                pool.submit(summarize_article_file, summarizer, file_path, True): file_path
+                for file_path in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    state['completed'] += 1
+                except Exception as e:
+                    logger.error(f"Error migrating {futures[future]}: {str(e)}")
+                    state['failed'] += 1
+                save_state(state)
+    finally:
+        summarizer.stop_server()
+
+    # Paragraphs whose summary failed are still pending; only switch when none are left
+    remaining = len(pending_articles(articles_dir, target)) # type: ignore
+    if remaining == 0 and activate:
+        set_active_version(target)
+        logger.info(f"Reader switched to summary version {target}")
+
+    state.update({
+        'remaining': remaining,
+        'status': 'complete' if remaining == 0 else 'incomplete',
+        'active': get_active_version(),
+        'finished_at': time.time(),
+    })
+    save_state(state)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-summarize the article library under a new version.")
+    parser.add_argument('--model', help="Ollama model to use (defaults to ollama.model in config)")
+    parser.add_argument('--workers', type=int, default=2, help="Articles summarized in parallel")
+    parser.add_argument('--no-activate', action='store_true',
+                        help="Leave the reader on the current version after migrating")
+    args = parser.parse_args()
+
+    state = migrate_summaries(model=args.model, workers=args.workers, activate=not args.no_activate)
+    print(json.dumps(state, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Optional
+from src.utils.config import get_config
+from src.utils.dates import parse_date
+from src.utils.logger import setup_logger
+from src.utils.read_status import load_read_status
+
+logger = setup_logger('summary_queue')
+config = get_config()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summary_queue (
+    file_path TEXT PRIMARY KEY,
+    published INTEGER NOT NULL,
+    requested INTEGER NOT NULL,
+    enqueued_at REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL
+)
+"""
+
+# A claim older than this is taken to belong to a worker that died mid-article
+CLAIM_TIMEOUT_SECONDS = 60 * 60
+
+
+class SummaryQueue:
+    """Persistent priority queue of article files waiting to be summarized.
+
+    Articles are ordered by explicit user request first, then unread state
+    (from the read status store), then newest published date. The queue lives
+    in SQLite so the app, the command-line pipeline and migrations share it:
+    pop() claims an article in one transaction, so no two workers in any
+    process summarize the same article at once.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(config['data_dir']), 'summary_queue.db')
+        self.db_path = db_path
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(SCHEMA)
+                if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                    self._import_legacy(conn)
+                    conn.execute("PRAGMA user_version = 1")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _import_legacy(self, conn: sqlite3.Connection):
+        """One-time import of the JSON file used before the database existed."""
+        legacy_path = os.path.join(os.path.dirname(self.db_path), 'summary_queue.json')
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading legacy summary queue, skipping it: {e}")
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO summary_queue VALUES (?, ?, ?, ?, NULL, NULL)",
+            [(path, entry['published'], int(entry['requested']), entry['enqueued_at'])
+             for path, entry in legacy.items()],
+        )
+
+    def push(self, file_path: str, published_date: str = '', requested: bool = False):
+        """Add an article to the queue, or raise its priority if already queued."""
+        published = parse_date(published_date).toordinal()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO summary_queue VALUES (?, ?, ?, ?, NULL, NULL) "
+                "ON CONFLICT (file_path) DO UPDATE SET "
+                "published = CASE WHEN ? != '' THEN excluded.published ELSE published END, "
+                "requested = MAX(requested, excluded.requested)",
+                (file_path, published, int(requested), time.time(), published_date),
+            )
+
+    def _claim_is_live(self, claimed_by: Optional[str], claimed_at: Optional[float]) -> bool:
+        if claimed_by is None or claimed_at < time.time() - CLAIM_TIMEOUT_SECONDS:
+            return False
+        host, _, pid = claimed_by.rpartition(':')
+        if host == socket.gethostname():
+            # A worker that died on this host frees its claim at once
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+        return True
+
+    def pop(self) -> Optional[str]:
+        """Claim the highest-priority article, or return None if nothing is waiting.
+
+        The article stays in the persisted queue until done() is called, so an
+        interrupted run picks it up again.
+        """
+        read_status = load_read_status()
+        with closing(self._connect()) as conn:
+            # Taking the write lock up front makes choosing and claiming one step
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT file_path, published, requested, enqueued_at, claimed_by, claimed_at FROM summary_queue"
+                ).fetchall()
+                waiting = [row for row in rows if not self._claim_is_live(row[4], row[5])]
+                if not waiting:
+                    conn.execute("COMMIT")
+                    return None
+
+                def priority(row):
+                    file_path, published, requested, enqueued_at = row[:4]
+                    return (requested, not read_status.get(file_path, False), published, -enqueued_at)
+
+                file_path = max(waiting, key=priority)[0]
+                conn.execute(
+                    "UPDATE summary_queue SET claimed_by = ?, claimed_at = ? WHERE file_path = ?",
+                    (self._owner, time.time(), file_path),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return file_path
+
+    def done(self, file_path: str):
+        """Remove a claimed article from the queue."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM summary_queue WHERE file_path = ?", (file_path,))
+
+    def release(self, file_path: str):
+        """Return a claimed article to the queue without removing it."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE summary_queue SET claimed_by = NULL, claimed_at = NULL "
+                "WHERE file_path = ? AND claimed_by = ?",
+                (file_path, self._owner),
+            )
+
+    def __contains__(self, file_path: str) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT 1 FROM summary_queue WHERE file_path = ?", (file_path,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM summary_queue").fetchone()[0]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_summary_queue() -> SummaryQueue:
+    """Return the process-wide summary queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = SummaryQueue()
+        return _queue
@@ -0,0 +1,41 @@
+from datetime import date, datetime
+
+DATE_FORMATS = ['%B %d, %Y', '%b %d, %Y', '%Y-%m-%d', '%d/%m/%Y']
+
+
+def parse_date(date_str):
+    """Parse date string to datetime object."""
+    if not date_str:
+        return datetime.min
+    try:
+        date_str = date_str.strip()
+        # Normalized ISO dates are the common case, so try them without strptime
+        try:
+            return datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
+        # Try different date formats
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+        return datetime.min
+    except (ValueError, TypeError, AttributeError):
+        return datetime.min
+
+
+def normalize_date(date_str):
+    """Return the date as an ISO 'YYYY-MM-DD' string, or '' if it can't be parsed."""
+    parsed = parse_date(date_str)
+    return '' if parsed == datetime.min else parsed.date().isoformat()
+
+
+def display_date(article):
+    """Return the publish date as scraped, falling back to the normalized ISO date."""
+    return article.get('published_date_raw') or article.get('published_date', '')
+
+
+def format_iso_date(iso_date):
+    """Format an ISO date for display, e.g. 'January 05, 2025'."""
+    return date.fromisoformat(iso_date).strftime('%B %d, %Y')
@@ -0,0 +1,50 @@
+import os
+import time
+from .logger import setup_logger
+
+logger = setup_logger('disk_cache')
+
+# Files used this recently are never pruned, so a concurrent export can still open them
+PRUNE_GRACE_SECONDS = 300
+
+
+def touch(path: str):
+    """Mark a cached file as just used; pruning removes the least recently used first."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune(cache_dir: str, max_bytes: int) -> int:
+    """Delete the least recently used files until the directory fits in max_bytes; returns the count removed."""
+    entries = []
+    total = 0
+    try:
+        with os.scandir(cache_dir) as scan:
+            for entry in scan:
+                if not entry.is_file() or entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except FileNotFoundError:
+        return 0
+
+    removed = 0
+    cutoff = time.time() - PRUNE_GRACE_SECONDS
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes or mtime > cutoff:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not prune {path}: {e}")
+            continue
+        total -= size
+    if removed:
+        logger.info(f"Pruned {removed} files from {cache_dir}, {total / 1024 / 1024:.0f} MB left")
+    return removed
@@ -0,0 +1,220 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from PIL import Image
+from .config import get_config
+from .disk_cache import touch
+from .logger import setup_logger
+
+logger = setup_logger('images')
+
+# Images wider than this are scaled down before they're sent to the reader
+DISPLAY_MAX_WIDTH = 800
+DEFAULT_IMAGE_CACHE_MB = 64
+
+
+def get_local_image_path(article_index, section_id):
+    """Get all image paths for a section."""
+    if not article_index:
+        return []
+
+    config = get_config()
+    base_path = os.path.join(config.get('images_dir', 'images'), f'article_{article_index.strip()}')
+    found_images = []
+
+    # Expanded patterns to catch more image variations
+    base_patterns = [
+        # Standard patterns
+        f'image_{section_id}.jpg',
+        f'image_{section_id}.png',
+        f'image_{section_id}.jpeg',
+        # Number after section
+        f'image_{section_id}_1.jpg',
+        f'image_{section_id}_2.jpg',
+        f'image_{section_id}_3.jpg',
+        f'image_{section_id}_4.jpg',
+        # Number with dot separator
+        f'image_{section_id}.1.jpg',
+        f'image_{section_id}.2.jpg',
+        f'image_{section_id}.3.jpg',
+        f'image_{section_id}.4.jpg'
+    ]
+
+    # Add PNG and JPEG variations
+    all_patterns = []
+    for pattern in base_patterns:
+        all_patterns.append(pattern)
+        all_patterns.append(pattern.replace('.jpg', '.png'))
+        all_patterns.append(pattern.replace('.jpg', '.jpeg'))
+
+    # Check all patterns against one listing of the directory
+    names = _image_dir_listing(base_path)
+    for pattern in all_patterns:
+        if pattern in names:
+            found_images.append(os.path.join(base_path, pattern))
+
+    # Sort found images to ensure consistent order
+    found_images.sort()
+    return found_images
+
+
+_image_dirs: Dict[str, tuple] = {}
+_image_dirs_lock = threading.Lock()
+
+
+def _image_dir_listing(base_path: str) -> frozenset:
+    """Return the file names in an article's image directory, re-listed only when the directory changes."""
+    try:
+        mtime = os.stat(base_path).st_mtime_ns
+    except FileNotFoundError:
+        return frozenset()
+    with _image_dirs_lock:
+        cached = _image_dirs.get(base_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    names = frozenset(os.listdir(base_path))
+    with _image_dirs_lock:
+        _image_dirs[base_path] = (mtime, names)
+    return names
+
+
+def get_derivative_dir():
+    """Return the directory holding downscaled image derivatives."""
+    config = get_config()
+    return os.path.join(os.path.dirname(config['data_dir']), 'image_cache')
+
+
+_content_hashes: Dict[tuple, str] = {}
+_content_hashes_lock = threading.Lock()
+
+
+def _content_hash(path: str) -> str:
+    """Hash an image's bytes, remembered per (path, mtime, size) so unchanged files aren't re-read."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _content_hashes_lock:
+        if key in _content_hashes:
+            return _content_hashes[key]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    with _content_hashes_lock:
+        _content_hashes[key] = digest
+    return digest
+
+
+def jpeg_derivative(path: str, max_px: int, quality: int) -> Optional[str]:
+    """Return a cached JPEG of the image scaled to fit max_px, creating it on first use.
+
+    Derivatives are named by the source's content hash and the settings, so
+    identical images downloaded for different articles share one file.
+    Returns None if the image can't be read.
+    """
+    try:
+        digest = _content_hash(path)
+    except OSError as e:
+        logger.warning(f"Could not read image {path}: {e}")
+        return None
+
+    derivative_path = os.path.join(get_derivative_dir(), f"{digest}_{max_px}_q{quality}.jpg")
+    if os.path.exists(derivative_path):
+        touch(derivative_path)
+        return derivative_path
+
+    try:
+        with Image.open(path) as image:
+            # JPEG sources decode straight at a reduced scale
+            image.draft('RGB', (max_px, max_px))
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, 'white')
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            else:
+                image = image.convert('RGB')
+            image.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+
+            os.makedirs(os.path.dirname(derivative_path), exist_ok=True)
+            tmp_path = f"{derivative_path}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, 'JPEG', quality=quality, optimize=True)
+        os.replace(tmp_path, derivative_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not create derivative of {path}: {e}")
+        return None
+    return derivative_path
+
+
+def section_image_derivatives(article_index, section_id, max_px: int, quality: int) -> List[str]:
+    """Return the JPEG derivatives of every downloaded image of one section."""
+    derivatives = []
+    for path in get_local_image_path(article_index, section_id):
+        derivative = jpeg_derivative(path, max_px, quality)
+        if derivative and derivative not in derivatives:
+            derivatives.append(derivative)
+    return derivatives
+
+
+_display_images: OrderedDict[tuple, Tuple[bytes, str]] = OrderedDict()
+_display_images_bytes = 0
+_display_images_lock = threading.Lock()
+
+
+def _encode_display_image(path: str, max_width: int) -> Tuple[bytes, str]:
+    """Return (encoded bytes, format) of the image scaled to fit max_width."""
+    with Image.open(path) as image:
+        if image.format in ('JPEG', 'PNG') and image.width <= max_width:
+            # Already small enough: send the file as is, without decoding it
+            with open(path, 'rb') as f:
+                return f.read(), image.format
+
+        # JPEG sources decode straight at a reduced scale
+        image.draft('RGB', (max_width, max_width * image.height // max(image.width, 1)))
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        image.thumbnail((max_width, image.height), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        if has_alpha:
+            image.save(buffer, 'PNG', optimize=True)
+            return buffer.getvalue(), 'PNG'
+        image.save(buffer, 'JPEG', quality=85)
+        return buffer.getvalue(), 'JPEG'
+
+
+def display_image(path: str, max_width: int = DISPLAY_MAX_WIDTH) -> Optional[Tuple[bytes, str]]:
+    """Return (encoded bytes, format) for showing an image in the reader, or None if it can't be read.
+
+    Results are kept in a process-wide LRU bounded by reader.image_cache_mb
+    and keyed by the file's mtime and size, so reopening an article does no
+    decoding at all. Pass the format to st.image as output_format so
+    Streamlit serves the bytes without re-encoding them.
+    """
+    global _display_images_bytes
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        logger.warning(f"Could not read image {path}: {e}")
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size, max_width)
+    with _display_images_lock:
+        if key in _display_images:
+            _display_images.move_to_end(key)
+            return _display_images[key]
+
+    try:
+        encoded = _encode_display_image(path, max_width)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load image {path}: {e}")
+        return None
+
+    max_bytes = get_config().get('reader', {}).get('image_cache_mb', DEFAULT_IMAGE_CACHE_MB) * 1024 * 1024
+    with _display_images_lock:
+        if key not in _display_images:
+            _display_images[key] = encoded
+            _display_images_bytes += len(encoded[0])
+        while _display_images_bytes > max_bytes and len(_display_images) > 1:
+            _, (data, _) = _display_images.popitem(last=False)
+            _display_images_bytes -= len(data)
+    return encoded
@@ -0,0 +1,6 @@
+import threading
+
+# Serializes read-modify-write cycles on data/raw/google_ai_links.csv.
+# The scraper marks rows checked and the image downloader records download
+# status in the same file, and the pipeline runs both from several threads.
+links_csv_lock = threading.RLock()
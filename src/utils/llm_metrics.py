@@ -0,0 +1,146 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+from .config import get_config
+
+# Timing fields Ollama reports with every completed generation, in nanoseconds
+DURATION_FIELDS = ('total_duration', 'load_duration', 'prompt_eval_duration', 'eval_duration')
+COUNT_FIELDS = ('prompt_eval_count', 'eval_count')
+# Once the log passes this size the oldest half of the calls is dropped
+MAX_BYTES = 5 * 1024 * 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def aggregate_calls(calls: List[Dict]) -> Dict:
+    """Aggregate raw call records into latency percentiles and throughput figures."""
+    latencies = [call['latency_s'] for call in calls]
+    eval_count = sum(call.get('eval_count', 0) for call in calls)
+    eval_s = sum(call.get('eval_duration', 0) for call in calls) / 1e9
+    prompt_count = sum(call.get('prompt_eval_count', 0) for call in calls)
+    prompt_s = sum(call.get('prompt_eval_duration', 0) for call in calls) / 1e9
+    load_s = sum(call.get('load_duration', 0) for call in calls) / 1e9
+    total_s = sum(call.get('total_duration', 0) for call in calls) / 1e9
+
+    return {
+        'calls': len(calls),
+        'p50_latency_s': round(percentile(latencies, 50), 3),
+        'p95_latency_s': round(percentile(latencies, 95), 3),
+        'tokens_per_s': round(eval_count / eval_s, 2) if eval_s else 0.0,
+        'prompt_tokens_per_s': round(prompt_count / prompt_s, 2) if prompt_s else 0.0,
+        'prompt_eval_s': round(prompt_s, 3),
+        'load_s': round(load_s, 3),
+        'load_overhead': round(load_s / total_s, 4) if total_s else 0.0,
+        'output_tokens': eval_count,
+    }
+
+
+class LLMMetrics:
+    """Append-only log of per-call Ollama timings with per-run/per-model aggregation."""
+
+    def __init__(self, metrics_path: str | None = None):
+        if metrics_path is None:
+            config = get_config()
+            metrics_path = os.path.join(os.path.dirname(config['data_dir']), 'llm_metrics.jsonl')
+        self.metrics_path = metrics_path
+        self._lock = threading.Lock()
+        # (mtime_ns, size) of the file the cached summary was built from
+        self._summary_signature = None
+        self._summary = None
+
+    def record(self, run_id: str, model: str, response: Dict, latency_s: float):
+        """Persist the timing fields of one Ollama response."""
+        entry = {
+            'run_id': run_id,
+            'model': model,
+            'timestamp': time.time(),
+            'latency_s': round(latency_s, 4),
+        }
+        for field in DURATION_FIELDS + COUNT_FIELDS:
+            if field in response:
+                entry[field] = response[field]
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.metrics_path) or '.', exist_ok=True)
+            with open(self.metrics_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                size = f.tell()
+            if size > MAX_BYTES:
+                self._trim()
+
+    def _trim(self):
+        """Keep only the newest half of the recorded calls."""
+        with open(self.metrics_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        tmp_path = f"{self.metrics_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[len(lines) // 2:])
+        os.replace(tmp_path, self.metrics_path)
+
+    def load_calls(self) -> List[Dict]:
+        """Read every recorded call, skipping lines that fail to parse."""
+        calls = []
+        try:
+            with open(self.metrics_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        calls.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return calls
+
+    def summary(self) -> Dict[str, Dict]:
+        """Return aggregates keyed by model and by run (runs in chronological order).
+
+        The aggregate is rebuilt only when the log file has changed since the last call.
+        """
+        try:
+            stat = os.stat(self.metrics_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        with self._lock:
+            if self._summary is not None and signature == self._summary_signature:
+                return self._summary
+
+        by_model = defaultdict(list)
+        by_run = defaultdict(list)
+        for call in self.load_calls():
+            by_model[call.get('model', '')].append(call)
+            by_run[call.get('run_id', '')].append(call)
+
+        runs = {}
+        for run_id, calls in sorted(by_run.items(), key=lambda item: item[1][0]['timestamp']):
+            runs[run_id] = {'model': calls[0].get('model', ''), **aggregate_calls(calls)}
+
+        summary = {
+            'models': {model: aggregate_calls(calls) for model, calls in by_model.items()},
+            'runs': runs,
+        }
+        with self._lock:
+            self._summary_signature, self._summary = signature, summary
+        return summary
+
+
+_metrics = None
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Return the process-wide LLM metrics recorder."""
+    global _metrics
+    if _metrics is None:
+        _metrics = LLMMetrics()
+    return _metrics
@@ -1,16 +1,127 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import sys
+import threading
 from datetime import datetime
 from .config import get_config
 
+# Optional structured fields, passed as logger.info(..., extra={'stage': ..., 'article_id': ..., 'duration_ms': ...})
+STRUCTURED_FIELDS = ('stage', 'article_id', 'duration_ms')
+
+DEFAULT_MAX_MB = 10
+DEFAULT_BACKUPS = 5
+
+# Argument types whose value can't change between the logging call and the listener thread
+IMMUTABLE_ARGS = (str, int, float, bool, type(None))
+
+_queue = None
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line, including any structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves the %-formatting of plain arguments to the listener thread.
+
+    The stock prepare() formats every record on the thread that logs it, so
+    that the record survives pickling. Records here never leave the process,
+    so a record whose arguments are all immutable is queued as it is. Other
+    records, and those carrying a traceback, are still formatted up front.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info is None and isinstance(record.args, tuple) \
+                and all(isinstance(arg, IMMUTABLE_ARGS) for arg in record.args):
+            return record
+        return super().prepare(record)
+
+
+def _log_file_name(structured: bool) -> str:
+    """Name this process's log file after its entry point, e.g. content_inspiration.pipeline.log.
+
+    Rotation renames the file, which breaks (and on Windows fails) while another
+    process has it open, so only the Streamlit app writes content_inspiration.log.
+    """
+    extension = 'jsonl' if structured else 'log'
+    script = sys.argv[0] if sys.argv else ''
+    role = os.path.splitext(os.path.basename(script))[0]
+    if role == '__main__':
+        # python -m package runs package/__main__.py
+        role = os.path.basename(os.path.dirname(script))
+    if role in ('', 'streamlit', 'main'):
+        return f"content_inspiration.{extension}"
+    return f"content_inspiration.{role.lstrip('-') or 'python'}.{extension}"
+
+
+def _start_listener(config) -> queue.Queue:
+    """Start the shared listener that writes queued records to the log file and console."""
+    global _queue, _listener
+    with _listener_lock:
+        if _listener is not None:
+            return _queue
+
+        handlers = []
+        # Spawned worker processes (PDF export) log to the console only: the
+        # parent process owns the log file and rotates it
+        if multiprocessing.parent_process() is None:
+            root_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+            log_dir = config.get('logs_dir', 'logs')
+            if not os.path.isabs(log_dir):
+                log_dir = os.path.join(root_dir, log_dir)
+            os.makedirs(log_dir, exist_ok=True)
+
+            # File handler - rotated by size rather than one unbounded file per day
+            structured = config.get('log_format', 'text') == 'json'
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, _log_file_name(structured)),
+                maxBytes=int(config.get('log_max_mb', DEFAULT_MAX_MB) * 1024 * 1024),
+                backupCount=config.get('log_backups', DEFAULT_BACKUPS),
+                encoding='utf-8',
+            )
+            file_handler.setFormatter(
+                JsonFormatter() if structured
+                else logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            )
+            handlers.append(file_handler)
+
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+        handlers.append(console_handler)
+
+        # Loggers only enqueue; this thread does all the I/O, and the message
+        # formatting too for records DeferredQueueHandler leaves unformatted
+        _queue = queue.Queue(-1)
+        _listener = logging.handlers.QueueListener(_queue, *handlers)
+        _listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(_listener.stop)
+        return _queue
+
+
 def setup_logger(name: str) -> logging.Logger:
-    """Configure logging with file and console handlers."""
+    """Configure a module logger that hands records to the shared background listener."""
     config = get_config()
-    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    log_dir = config.get('logs_dir', 'logs')
-    if not os.path.isabs(log_dir):
-        log_dir = os.path.join(root_dir, log_dir)
-    os.makedirs(log_dir, exist_ok=True)
 
     # Create logger
     logger = logging.getLogger(name)
@@ -19,24 +130,8 @@ def setup_logger(name: str) -> logging.Logger:
 
     # Prevent adding handlers multiple times
     if not logger.handlers:
-        # File handler - daily log file
-        log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y-%m-%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logger.level)
-
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logger.level)
-
-        # Create formatters and add to handlers
-        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        console_formatter = logging.Formatter('%(levelname)s: %(message)s')
-        
-        file_handler.setFormatter(file_formatter)
-        console_handler.setFormatter(console_formatter)
-
-        # Add handlers to the logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Filtered-out calls cost only the level check, as long as callers pass
+        # arguments (logger.debug("... %s", value)) instead of f-strings
+        logger.addHandler(DeferredQueueHandler(_start_listener(config)))
 
-    return logger
\ No newline at end of file
+    return logger
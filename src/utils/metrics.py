@@ -0,0 +1,178 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict
+from .config import get_config
+from .llm_metrics import percentile
+
+# Upper bounds (seconds) of the latency histogram buckets exported to Prometheus
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Recent durations kept per span for the p50/p95 in reports
+MAX_SAMPLES = 5000
+# Run reports kept in the metrics directory
+RUN_REPORTS_KEPT = 50
+PROMETHEUS_PREFIX = 'content_inspiration'
+
+
+def get_metrics_dir():
+    """Return the directory holding per-run metric reports and the Prometheus textfile."""
+    config = get_config()
+    return os.path.join(os.path.dirname(config['data_dir']), 'metrics')
+
+
+def _series(name: str, labels: Dict) -> tuple:
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+def _label_text(labels: tuple, extra: tuple = ()) -> str:
+    pairs = [f'{key}="{value}"' for key, value in labels + extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metrics:
+    """Process-wide counters and span latency histograms.
+
+    Spans time a block of code under a name and optional labels:
+        with get_metrics().span('get_url', page='article'): ...
+    or decorate a function with @timed('get_url'). A span that raises also
+    counts one '<name>_errors'. Everything is kept in memory; the pipeline
+    resets it when a run starts and writes a report when the run ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every counter and span recorded so far."""
+        with self._lock:
+            self._counters = defaultdict(float)
+            self._buckets = defaultdict(lambda: [0] * len(BUCKETS))
+            self._sums = defaultdict(float)
+            self._counts = defaultdict(int)
+            self._samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+            self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter."""
+        with self._lock:
+            self._counters[_series(name, labels)] += value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration for a span."""
+        series = _series(name, labels)
+        with self._lock:
+            buckets = self._buckets[series]
+            for idx, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    buckets[idx] += 1
+            self._sums[series] += seconds
+            self._counts[series] += 1
+            self._samples[series].append(seconds)
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """Time the enclosed block as one observation of the named span."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+    def snapshot(self) -> Dict:
+        """Return counters and per-span count, total and p50/p95 latency."""
+        with self._lock:
+            spans = []
+            for (name, labels), count in sorted(self._counts.items()):
+                samples = list(self._samples[(name, labels)])
+                spans.append({
+                    'span': name,
+                    'labels': dict(labels),
+                    'count': count,
+                    'total_s': round(self._sums[(name, labels)], 3),
+                    'p50_s': round(percentile(samples, 50), 4),
+                    'p95_s': round(percentile(samples, 95), 4),
+                })
+            counters = [
+                {'counter': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {'started_at': self.started_at, 'spans': spans, 'counters': counters}
+
+    def to_prometheus(self) -> str:
+        """Render everything in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            family = f"{PROMETHEUS_PREFIX}_span_seconds"
+            lines.append(f"# HELP {family} Time spent in instrumented pipeline and app code.")
+            lines.append(f"# TYPE {family} histogram")
+            for (name, labels), count in sorted(self._counts.items()):
+                series = (('span', name),) + labels
+                for bound, bucket in zip(BUCKETS, self._buckets[(name, labels)]):
+                    lines.append(f"{family}_bucket{_label_text(series, (('le', str(bound)),))} {bucket}")
+                lines.append(f"{family}_bucket{_label_text(series, (('le', '+Inf'),))} {count}")
+                lines.append(f"{family}_sum{_label_text(series)} {self._sums[(name, labels)]:.6f}")
+                lines.append(f"{family}_count{_label_text(series)} {count}")
+
+            by_name = defaultdict(list)
+            for (name, labels), value in sorted(self._counters.items()):
+                by_name[name].append((labels, value))
+            for name, series in by_name.items():
+                family = f"{PROMETHEUS_PREFIX}_{name}_total"
+                lines.append(f"# TYPE {family} counter")
+                for labels, value in series:
+                    lines.append(f"{family}{_label_text(labels)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+    def write_run_report(self, run_info: Dict) -> Dict:
+        """Write this run's JSON report and refresh the Prometheus textfile; returns the snapshot."""
+        metrics_dir = get_metrics_dir()
+        os.makedirs(metrics_dir, exist_ok=True)
+        snapshot = self.snapshot()
+        run_id = time.strftime('%Y%m%d_%H%M%S', time.localtime(snapshot['started_at']))
+
+        report_path = os.path.join(metrics_dir, f"run_{run_id}.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({**run_info, **snapshot}, f, indent=2)
+
+        # Written atomically so a node_exporter textfile collector never reads half a file
+        prom_path = os.path.join(metrics_dir, 'pipeline.prom')
+        with open(f"{prom_path}.tmp", 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(f"{prom_path}.tmp", prom_path)
+
+        reports = sorted(name for name in os.listdir(metrics_dir) if name.startswith('run_'))
+        for name in reports[:-RUN_REPORTS_KEPT]:
+            os.remove(os.path.join(metrics_dir, name))
+        return snapshot
+
+
+def timed(name: str, **labels):
+    """Decorator that records every call of the function as a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
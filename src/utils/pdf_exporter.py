@@ -1,40 +1,205 @@
 from fpdf import FPDF
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+import hashlib
+import io
+import json
+import math
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
+from src.utils.config import get_config
+from src.utils.dates import display_date
+from src.utils.disk_cache import prune, touch
+from src.utils.images import get_derivative_dir, section_image_derivatives
 from src.utils.logger import setup_logger
+from src.utils.summary_versions import get_active_version, paragraph_summary
 
 logger = setup_logger('pdf_exporter')
+config = get_config()
+
+# Bump whenever the article layout below changes so cached fragments are re-rendered
+RENDER_VERSION = "2"
+
+# Section images are embedded as JPEG derivatives scaled to fit this box
+DEFAULT_IMAGE_MAX_PX = 1000
+DEFAULT_IMAGE_QUALITY = 70
+MAX_IMAGE_HEIGHT_MM = 120
+
+# Disk budgets for rendered fragments and image derivatives; least recently used files go first
+DEFAULT_FRAGMENT_CACHE_MB = 256
+DEFAULT_DERIVATIVE_CACHE_MB = 256
+
+# Below this many uncached articles, starting worker processes costs more than it saves
+SHARD_MIN_ARTICLES = 24
+
+
+def get_pdf_cache_dir():
+    """Return the directory holding rendered per-article PDF fragments."""
+    return os.path.join(os.path.dirname(config['data_dir']), 'pdf_cache')
+
+
+def article_render_key(article, version, images=None):
+    """Hash everything that affects how an article is laid out in the PDF."""
+    content = {key: value for key, value in article.items() if not key.startswith('_')}
+    # Derivative names carry the source image's content hash and the size settings
+    images = [[os.path.basename(path) for path in paths] for paths in images or []]
+    payload = json.dumps([RENDER_VERSION, version, content, images], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
 
 class MultiArticlePDFExporter:
-    def __init__(self):
+    """Renders articles to PDF, reusing each article's pages from a content-keyed cache.
+
+    Every article is laid out once into its own small PDF, stored under
+    the hash of its content. An export renders only the cover page and the
+    articles whose content changed, then merges the fragments in memory.
+
+    Section images are embedded as downscaled JPEG derivatives. image_max_px
+    and image_quality trade file size against sharpness, and identical
+    images are stored once in the merged PDF.
+    """
+
+    def __init__(self, cache_dir=None, include_images=None, image_max_px=None, image_quality=None):
+        export_config = config.get('pdf_export', {})
         self.pdf = None
-    
+        self.cache_dir = cache_dir or get_pdf_cache_dir()
+        self.include_images = export_config.get('include_images', True) if include_images is None else include_images
+        self.image_max_px = image_max_px or export_config.get('image_max_px', DEFAULT_IMAGE_MAX_PX)
+        self.image_quality = image_quality or export_config.get('image_quality', DEFAULT_IMAGE_QUALITY)
+        self.last_stats = {'articles': 0, 'cached': 0, 'rendered': 0, 'render_ms': 0.0}
+
+    def render(self, articles, workers=None):
+        """Render the articles behind a cover page and return the PDF as bytes.
+
+        When enough articles are missing from the cache, they are laid out in
+        shards across a process pool (fpdf2 layout is single-threaded Python).
+        The fragments are then merged in the original order.
+        """
+        started_at = time.perf_counter()
+        version = get_active_version()
+        if workers is None:
+            workers = config.get('pdf_export', {}).get('workers') or os.cpu_count() or 1
+
+        fragments = [None] * len(articles)
+        missing = []
+        for idx, article in enumerate(articles):
+            fragments[idx] = self._cached_fragment(article, version)
+            if fragments[idx] is None:
+                missing.append(idx)
+
+        if workers > 1 and len(missing) >= SHARD_MIN_ARTICLES:
+            rendered = self._render_sharded([articles[idx] for idx in missing], version, workers)
+        else:
+            workers = 1
+            rendered = [self._render_fragment(articles[idx], version) for idx in missing]
+        for idx, fragment in zip(missing, rendered):
+            fragments[idx] = fragment
+
+        writer = PdfWriter()
+        writer.append(PdfReader(io.BytesIO(self._render_cover(len(articles)))))
+        for fragment in fragments:
+            writer.append(PdfReader(io.BytesIO(fragment)))
+
+        if self.include_images:
+            # Fragments each embed their own copy of a shared image; keep one
+            writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        self._prune_caches()
+        self.last_stats = {
+            'articles': len(articles),
+            'cached': len(articles) - len(missing),
+            'rendered': len(missing),
+            'workers': workers,
+            'render_ms': round((time.perf_counter() - started_at) * 1000, 1),
+        }
+        logger.info(f"Rendered PDF of {len(articles)} articles ({self.last_stats['cached']} from cache, "
+                    f"{workers} workers) in {self.last_stats['render_ms']:.0f} ms")
+        return buffer.getvalue()
+
+    def _render_sharded(self, articles, version, workers):
+        """Lay out articles in a process pool; returns their fragments in input order."""
+        # Several small shards per worker even out articles of very different lengths
+        shard_size = max(1, math.ceil(len(articles) / (workers * 4)))
+        shards = [articles[start:start + shard_size] for start in range(0, len(articles), shard_size)]
+        settings = {
+            'cache_dir': self.cache_dir,
+            'include_images': self.include_images,
+            'image_max_px': self.image_max_px,
+            'image_quality': self.image_quality,
+        }
+        # spawn rather than fork: the app process runs Streamlit and worker threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = pool.map(_render_shard, [settings] * len(shards), [version] * len(shards), shards)
+            return [fragment for shard in results for fragment in shard]
+
+    def _prune_caches(self):
+        """Keep the fragment and image derivative caches within their configured sizes."""
+        export_config = config.get('pdf_export', {})
+        prune(self.cache_dir, export_config.get('fragment_cache_mb', DEFAULT_FRAGMENT_CACHE_MB) * 1024 * 1024)
+        if self.include_images:
+            prune(get_derivative_dir(),
+                  export_config.get('derivative_cache_mb', DEFAULT_DERIVATIVE_CACHE_MB) * 1024 * 1024)
+
     def export_articles_to_pdf(self, articles, output_path):
-        """Export multiple articles to a single PDF using fpdf2."""
+        """Export multiple articles to a single PDF file."""
         try:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            self.pdf = FPDF()
-            self.pdf.set_auto_page_break(auto=True, margin=15)
-            
-            # Add cover page
-            self._create_cover_page(len(articles))
-            
-            # Add each article
-            for idx, article in enumerate(articles):
-                self.pdf.add_page()
-                self._create_article_content(article)
-            
-            # Save PDF
-            self.pdf.output(output_path)
+            with open(output_path, 'wb') as f:
+                f.write(self.render(articles))
             logger.info(f"Successfully exported {len(articles)} articles to {output_path}")
             return True
             
         except Exception as e:
             logger.error(f"Error exporting articles to PDF: {str(e)}")
             return False
-    
+
+    def _new_pdf(self):
+        self.pdf = FPDF()
+        self.pdf.set_auto_page_break(auto=True, margin=15)
+        return self.pdf
+
+    def _render_cover(self, article_count):
+        self._new_pdf()
+        self._create_cover_page(article_count)
+        return bytes(self.pdf.output())
+
+    def _fragment_path(self, article, version, images):
+        return os.path.join(self.cache_dir, f"{article_render_key(article, version, images)}.pdf")
+
+    def _cached_fragment(self, article, version):
+        """Return the article's cached pages, or None if its content changed since they were rendered."""
+        fragment_path = self._fragment_path(article, version, self._article_images(article))
+        try:
+            with open(fragment_path, 'rb') as f:
+                fragment = f.read()
+        except FileNotFoundError:
+            return None
+        touch(fragment_path)
+        return fragment
+
+    def _render_fragment(self, article, version):
+        """Lay out the article on its own pages and store them in the cache."""
+        images = self._article_images(article)
+        self._new_pdf()
+        self.pdf.add_page()
+        self._create_article_content(article, version, images)
+        fragment = bytes(self.pdf.output())
+
+        fragment_path = self._fragment_path(article, version, images)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{fragment_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(fragment)
+        os.replace(tmp_path, fragment_path)
+        return fragment
+
     def _create_cover_page(self, article_count):
         """Create a cover page for the PDF."""
         if self.pdf is None:
@@ -52,7 +217,31 @@ class MultiArticlePDFExporter:
         export_date = datetime.now().strftime('%B %d, %Y')
         self.pdf.cell(0, 10, f'Exported on: {export_date}', 0, 1, 'C')
     
-    def _create_article_content(self, article):
+    def _article_images(self, article):
+        """Return the image derivatives to embed for each section of the article."""
+        sections = article.get('sections', [])
+        if not self.include_images:
+            return [[] for _ in sections]
+        article_index = os.path.basename(article.get('_file_path', '')).split('_')[0]
+        return [
+            section_image_derivatives(article_index, section.get('section_id', idx + 1),
+                                      self.image_max_px, self.image_quality)
+            for idx, section in enumerate(sections)
+        ]
+
+    def _add_image(self, path):
+        """Place an image in the text flow, scaled to the page width and a maximum height."""
+        with Image.open(path) as image:
+            width_px, height_px = image.size
+        # Never upscale past 96 dpi; fpdf breaks the page first if the image doesn't fit
+        width = min(self.pdf.epw, width_px * 25.4 / 96)
+        height = width * height_px / width_px
+        if height > MAX_IMAGE_HEIGHT_MM:
+            width, height = width * MAX_IMAGE_HEIGHT_MM / height, MAX_IMAGE_HEIGHT_MM
+        self.pdf.image(path, x=self.pdf.l_margin + (self.pdf.epw - width) / 2, w=width, h=height)
+        self.pdf.ln(3)
+
+    def _create_article_content(self, article, active_version=None, images=None):
         """Create content for a single article."""
         if self.pdf is None:
             return
@@ -66,8 +255,8 @@ class MultiArticlePDFExporter:
         # Article metadata (date, author, publisher)
         metadata_parts = []
         
-        if article.get('published_date'):
-            metadata_parts.append(f"Date: {article['published_date']}")
+        if display_date(article):
+            metadata_parts.append(f"Date: {display_date(article)}")
         
         if article.get('author'):
             metadata_parts.append(f"Author: {article['author']}")
@@ -84,17 +273,25 @@ class MultiArticlePDFExporter:
             self.pdf.ln(5)
         
         # Article sections
-        for section in article.get('sections', []):
+        if active_version is None:
+            active_version = get_active_version()
+        for section_idx, section in enumerate(article.get('sections', [])):
             if section.get('section_title'):
                 self.pdf.set_font('Arial', 'B', 14)
                 section_title = self._clean_text(section['section_title'])
                 self.pdf.multi_cell(0, 8, section_title)
                 self.pdf.ln(3)
+
+            for image_path in (images[section_idx] if images else []):
+                try:
+                    self._add_image(image_path)
+                except Exception as e:
+                    logger.warning(f"Skipping image {image_path} in PDF: {e}")
             
             self.pdf.set_font('Arial', '', 11)
             for paragraph in section.get('paragraphs', []):
                 if isinstance(paragraph, dict):
-                    text = paragraph.get('summary', paragraph.get('original', ''))
+                    text = paragraph_summary(paragraph, active_version) or paragraph.get('original', '')
                 else:
                     text = str(paragraph)
                 
@@ -151,4 +348,46 @@ class MultiArticlePDFExporter:
             text = text.encode('latin-1', 'replace').decode('latin-1')
         except:
             text = text.encode('ascii', 'ignore').decode('ascii')
-        return text
\ No newline at end of file
+        return text
+
+
+def _render_shard(settings, version, articles):
+    """Process pool entry point: render one shard of articles to fragments."""
+    exporter = MultiArticlePDFExporter(**settings)
+    return [exporter._render_fragment(article, version) for article in articles]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _load_articles(file_paths):
+    """Read the article files in order; articles deleted since they were selected drop out."""
+    articles = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                article = json.load(f)
+        except FileNotFoundError:
+            continue
+        article['_file_path'] = file_path
+        articles.append(article)
+    return articles
+
+
+def submit_export(file_paths) -> Future:
+    """Render a PDF of the article files on a background thread; the future resolves to (bytes, stats).
+
+    The bodies are read by the worker rather than through the reader's
+    article cache, so a large export neither blocks the UI nor evicts it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='pdf-export')
+
+    def render():
+        exporter = MultiArticlePDFExporter()
+        return exporter.render(_load_articles(file_paths)), exporter.last_stats
+
+    return _executor.submit(render)
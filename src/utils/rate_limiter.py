@@ -1,18 +1,22 @@
+import threading
 import time
 from functools import wraps
 
 def rate_limit(seconds_per_request=1):
-    """Rate limiting decorator"""
+    """Rate limiting decorator, shared across threads calling the same function"""
     def decorator(func):
-        last_called = [0.0]
+        next_slot = [0.0]
+        lock = threading.Lock()
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            elapsed = time.time() - last_called[0]
-            if elapsed < seconds_per_request:
-                time.sleep(seconds_per_request - elapsed)
-            result = func(*args, **kwargs)
-            last_called[0] = time.time()
-            return result
+            # Reserve the next free slot under the lock, then wait outside it
+            with lock:
+                now = time.time()
+                start_at = max(now, next_slot[0])
+                next_slot[0] = start_at + seconds_per_request
+            if start_at > now:
+                time.sleep(start_at - now)
+            return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
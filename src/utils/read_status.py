@@ -0,0 +1,75 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from .config import get_config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS read_status (
+    file_path TEXT PRIMARY KEY,
+    is_read INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
+def get_read_status_path():
+    """Return the path of the shared read status database."""
+    config = get_config()
+    return os.path.join(os.path.dirname(config['data_dir']), 'read_status.db')
+
+
+def _connect():
+    status_path = get_read_status_path()
+    conn = sqlite3.connect(status_path, timeout=30)
+    with _schema_lock:
+        if status_path not in _schema_ready:
+            _create_schema(conn, status_path)
+            _schema_ready.add(status_path)
+    return conn
+
+
+def _create_schema(conn, status_path):
+    # WAL lets every session and replica read while one of them writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        conn.execute(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+            # One-time import of the JSON file used before the database existed
+            legacy_path = os.path.join(os.path.dirname(status_path), 'read_status.json')
+            try:
+                with open(legacy_path, 'r') as f:
+                    legacy = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                legacy = {}
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO read_status VALUES (?, ?, ?)",
+                [(path, int(bool(is_read)), now) for path, is_read in legacy.items()],
+            )
+            conn.execute("PRAGMA user_version = 1")
+
+
+def load_read_status():
+    """Load the read status of every article as a {file path: bool} dict."""
+    os.makedirs(os.path.dirname(get_read_status_path()), exist_ok=True)
+    with closing(_connect()) as conn:
+        rows = conn.execute("SELECT file_path, is_read FROM read_status").fetchall()
+    return {file_path: bool(is_read) for file_path, is_read in rows}
+
+
+def set_read_status(file_path, is_read):
+    """Record one article's read status; only writes if the stored value differs."""
+    os.makedirs(os.path.dirname(get_read_status_path()), exist_ok=True)
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT INTO read_status VALUES (?, ?, ?) "
+            "ON CONFLICT (file_path) DO UPDATE SET is_read = excluded.is_read, updated_at = excluded.updated_at "
+            "WHERE is_read != excluded.is_read",
+            (file_path, int(bool(is_read)), time.time()),
+        )
@@ -0,0 +1,17 @@
+from urllib.parse import urlparse
+
+
+def get_source_name(url):
+    """Derive a readable publisher name from an article URL."""
+    if not url:
+        return ''
+    lowered = url.lower()
+    if 'research.google' in lowered or 'googleblog' in lowered:
+        return 'Google Research'
+    if 'nvidia.com' in lowered:
+        return 'NVIDIA'
+    try:
+        domain = urlparse(url).netloc.replace('www.', '').split('.')[0]
+        return domain.capitalize()
+    except Exception:
+        return ''
@@ -0,0 +1,58 @@
+import json
+import os
+from typing import Optional
+from .config import get_config
+
+
+def get_version_path():
+    """Return the path of the file that records which summary version is served."""
+    config = get_config()
+    return os.path.join(os.path.dirname(config['data_dir']), 'summary_version.json')
+
+
+def get_active_version() -> Optional[str]:
+    """Return the summary version the reader serves, or None before any migration."""
+    try:
+        with open(get_version_path(), 'r', encoding='utf-8') as f:
+            return json.load(f).get('active')
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def set_active_version(version: str):
+    """Atomically switch the reader to another summary version."""
+    version_path = get_version_path()
+    os.makedirs(os.path.dirname(version_path), exist_ok=True)
+    tmp_path = f"{version_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'active': version}, f)
+    os.replace(tmp_path, version_path)
+
+
+def has_summary(paragraph, version: str | None = None) -> bool:
+    """Check whether a paragraph has a summary, optionally for one specific version."""
+    if not isinstance(paragraph, dict):
+        return False
+    if version is not None:
+        return version in paragraph.get('summaries', {})
+    return 'summary' in paragraph or bool(paragraph.get('summaries'))
+
+
+def paragraph_summary(paragraph, version: str | None = None) -> Optional[str]:
+    """Return the summary to display for a paragraph.
+
+    Prefers the requested version, then the legacy unversioned 'summary' key,
+    then the oldest stored version, so a version a migration is still writing
+    is never served early. Returns None if the paragraph has not been
+    summarized at all.
+    """
+    if not isinstance(paragraph, dict):
+        return None
+    summaries = paragraph.get('summaries', {})
+    if version in summaries:
+        return summaries[version]
+    if 'summary' in paragraph:
+        return paragraph['summary']
+    if summaries:
+        return next(iter(summaries.values()))
+    return None
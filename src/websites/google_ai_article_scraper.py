@@ -10,6 +10,10 @@ from src.utils.logger import setup_logger
 from src.utils.rate_limiter import rate_limit
 from src.utils.retry import retry_on_failure
 from src.utils.config import get_config
+from src.utils.dates import normalize_date
+from src.utils.links_csv import links_csv_lock
+from src.utils.metrics import get_metrics, timed
+from src.library_index import get_library_index
 import glob
 from urllib.parse import urljoin
 
@@ -43,14 +47,17 @@ MONTH_NAMES = (
 
 @rate_limit(seconds_per_request=SECONDS_PER_REQUEST)
 @retry_on_failure(max_retries=config.get('max_retries', 3))
-
+# Timed per attempt, so the rate limiter's waits aren't counted as fetch time
+@timed('get_url', page='article')
 def get_url(url):
     """Fetch URL with rate limiting and retry logic."""
     try:
         timeout = config.get('timeout', 30)
         response = requests.get(url, headers=HEADERS, timeout=timeout)
         response.raise_for_status()
-        return BeautifulSoup(response.content, 'html.parser')
+        get_metrics().inc('http_bytes', len(response.content), page='article')
+        with get_metrics().span('html_parse', page='article'):
+            return BeautifulSoup(response.content, 'html.parser')
     except Exception as e:
         logger.error(f"Error fetching {url}: {e}")
         raise
@@ -96,13 +103,15 @@ def get_image_url(img, base_url):
             img_url = srcset.split(",")[0].strip().split(" ")[0]
     return urljoin(base_url, img_url) if img_url else None
 
+@timed('scrape_data')
 def scrape_data(soup, url):
     date, author = extract_article_metadata(soup)
 
     article_data = {
         "title": soup.find("h1").text.strip() if soup and soup.find("h1") else "No Title",
         "url": url,
-        "published_date": date,
+        "published_date": normalize_date(date),
+        "published_date_raw": date,
         "author": author,
         "sections": [],
         "scraped_date": datetime.now(timezone.utc).isoformat()
@@ -123,7 +132,7 @@ def scrape_data(soup, url):
         return article_data
 
     # Debug print to check what we're finding
-    logger.debug(f"Found {len(article_body.find_all('img'))} images in article {url}")
+    logger.debug("Found %d images in article %s", len(article_body.find_all('img')), url)
 
     # Find all h2, h3, p, and img tags
     for elem in article_body.find_all(["h2", "h3", "p", "img"], recursive=True):
@@ -144,12 +153,12 @@ def scrape_data(soup, url):
             for img in elem.find_all("img"):
                 img_url = get_image_url(img, url)
                 if img_url:
-                    logger.debug(f"Found image in paragraph: {img_url}")
+                    logger.debug("Found image in paragraph: %s", img_url)
                     current_section["images"].append(img_url)
         elif elem.name == "img":
             img_url = get_image_url(elem, url)
             if img_url:
-                logger.debug(f"Found standalone image: {img_url}")
+                logger.debug("Found standalone image: %s", img_url)
                 current_section["images"].append(img_url)
 
     # Don't forget the last section
@@ -159,11 +168,12 @@ def scrape_data(soup, url):
     # Debug print for sections with images
     for section in sections:
         if section["images"]:
-            logger.debug(f"Section {section['section_id']} has {len(section['images'])} images")
+            logger.debug("Section %s has %d images", section['section_id'], len(section['images']))
 
     article_data["sections"] = sections
     return article_data
 
+@timed('save_article')
 def save_article(article_data, idx):
     """Save the scraped article data to a JSON file."""
     try:
@@ -194,49 +204,39 @@ def save_article(article_data, idx):
 
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(article_data, f, ensure_ascii=False, indent=2)
-        logger.info(f"Successfully saved article: {safe_title} with index {new_index}")
+        logger.info("Successfully saved article: %s with index %s", safe_title, new_index,
+                    extra={'stage': 'articles', 'article_id': str(new_index)})
+
+        try:
+            get_library_index().upsert(output_path, article_data)
+        except Exception as e:
+            logger.warning(f"Could not update library index for {output_path}: {e}")
 
-        return new_index
+        return output_path
 
     except Exception as e:
         logger.error(f"Error saving article {idx}: {e}", exc_info=True)
+        get_metrics().inc('save_article_errors')
         return None
 
-# --- Run for all URLs in the CSV and update 'checked' column ---
-def scrape_articles_from_links(progress_callback=None):
-    """Scrape articles with progress tracking."""
-    try:
+def pending_links():
+    """Return (CSV row index, url) for every link that hasn't been scraped yet."""
+    with links_csv_lock:
         df = pd.read_csv(CSV_FILE)
-        to_process = df[~df.get('checked', False)]
-        total_articles = len(to_process)
-        processed = 0
-
-        if total_articles == 0:
-            logger.info("No new articles to process")
-            return 0
+    to_process = df[~df.get('checked', False)]
+    return [(idx, row['url']) for idx, row in to_process.iterrows()]
 
-        for idx, row in to_process.iterrows():
-            try:
-                if progress_callback:
-                    progress = processed / total_articles
-                    progress_callback(progress, f"Processing article {processed + 1}/{total_articles}")
-
-                url = row['url']
-                if soup := get_url(url):
-                    article_data = scrape_data(soup, url)
-                    save_article(article_data, idx)
-                    df.at[idx, 'checked'] = True
-                    processed += 1
-
-                    # Save progress after each article
-                    df.to_csv(CSV_FILE, index=False)
-
-            except Exception as e:
-                logger.error(f"Error processing article {idx}: {e}")
-                continue
+@timed('links_csv_write')
+def mark_link_checked(idx):
+    """Record in the CSV that the link at this row index has been scraped."""
+    with links_csv_lock:
+        df = pd.read_csv(CSV_FILE)
+        df.at[idx, 'checked'] = True
+        df.to_csv(CSV_FILE, index=False)
 
-        return processed
+def fetch_article(url):
+    """Download and parse one article page; returns the article data or None."""
+    if soup := get_url(url):
+        return scrape_data(soup, url)
+    return None
 
-    except Exception as e:
-        logger.error(f"Fatal error in article scraping: {e}")
-        return 0
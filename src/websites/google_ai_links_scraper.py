@@ -5,6 +5,7 @@ from urllib.parse import urljoin
 from src.utils.config import get_config
 import pandas as pd
 from src.utils.logger import setup_logger
+from src.utils.metrics import get_metrics, timed
 from dotenv import load_dotenv
 
 logger = setup_logger('links_scraper')
@@ -42,6 +43,7 @@ def load_base_url(url_index=0):
         logger.error(f"Error loading config: {str(e)}", exc_info=True)
         return None
 
+@timed('get_url', page='homepage')
 def get_url(base_url):
     """Fetch the HTML content of the base URL."""
     try:
@@ -50,7 +52,9 @@ def get_url(base_url):
         logger.info(f"Fetching URL: {base_url}")
         response = requests.get(base_url, headers=HEADERS, timeout=timeout)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        get_metrics().inc('http_bytes', len(response.content), page='homepage')
+        with get_metrics().span('html_parse', page='homepage'):
+            soup = BeautifulSoup(response.content, 'html.parser')
         return soup
     except requests.RequestException as e:
         logger.error(f"Error fetching {base_url}: {str(e)}", exc_info=True)
@@ -78,7 +82,7 @@ def get_links(soup, base_url):
             raw_title = title_span.get_text(" ", strip=True)
             post_url = link_tag['href']
             if '/blog/' not in post_url:
-                logger.debug(f"Skipping non-blog card URL: {post_url}")
+                logger.debug("Skipping non-blog card URL: %s", post_url)
                 continue
             post_url = urljoin(base_url, post_url)
             raw_titles.append(raw_title)
@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.embeddings import EmbeddingStore, OllamaEmbedder
+
+DIM = 32
+
+
+def bag_of_words(text):
+    """Deterministic stand-in for a real embedding: word counts hashed into DIM buckets."""
+    vector = [0.0] * DIM
+    for word in text.lower().split():
+        vector[sum(map(ord, word.strip('.,'))) % DIM] += 1.0
+    return vector
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Answers /api/embed like Ollama; requests wait while the server's gate is closed."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.calls += 1
+        self.server.gate.wait(10)
+        data = json.dumps({'embeddings': [bag_of_words(text) for text in body['input']]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    server.calls = 0
+    server.gate = threading.Event()
+    server.gate.set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.gate.set()
+    server.shutdown()
+
+
+@pytest.fixture
+def embedder(stub_server):
+    return OllamaEmbedder(model='stub-embed', base_url=f"http://127.0.0.1:{stub_server.server_port}")
+
+
+def write_article(articles_dir, name, title, paragraphs):
+    path = articles_dir / name
+    path.write_text(json.dumps({
+        'title': title,
+        'sections': [{'section_title': '', 'paragraphs': [{'original': text} for text in paragraphs]}],
+    }), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def library(tmp_path):
+    articles_dir = tmp_path / 'articles'
+    articles_dir.mkdir()
+    paths = {
+        'robots': write_article(articles_dir, '0_robots.json', 'Robots learn to walk',
+                                ['Reinforcement learning teaches robots balance.']),
+        'robot_arms': write_article(articles_dir, '1_arms.json', 'Robot arms learn grasping',
+                                    ['Reinforcement learning teaches robot arms to grasp.']),
+        'proteins': write_article(articles_dir, '2_proteins.json', 'Protein structure prediction',
+                                  ['Folding proteins with attention over amino acid chains.']),
+    }
+    return articles_dir, paths
+
+
+def test_update_embeds_new_articles_and_skips_unchanged(tmp_path, library, embedder, stub_server):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+
+    assert store.update(embedder, str(articles_dir)) == {'embedded': 3, 'skipped': 0}
+    calls = stub_server.calls
+    assert store.update(embedder, str(articles_dir)) == {'embedded': 0, 'skipped': 3}
+    assert stub_server.calls == calls
+
+    # Changed text replaces the article's rows; the old ones are marked dead
+    old_text = 'Folding proteins with attention over amino acid chains.'
+    assert store.search(embedder, old_text)[0]['file_path'] == paths['proteins']
+    write_article(articles_dir, '2_proteins.json', 'Protein design', ['Designing new enzymes.'])
+    assert store.update(embedder, str(articles_dir)) == {'embedded': 1, 'skipped': 2}
+    # The replaced paragraph's rows are dead, so the old text no longer finds the article first
+    hits = store.search(embedder, old_text)
+    assert hits[0]['file_path'] != paths['proteins']
+    assert store.search(embedder, 'Designing new enzymes.')[0]['file_path'] == paths['proteins']
+
+
+def test_search_ranks_the_best_matching_paragraph(tmp_path, library, embedder):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+    store.update(embedder, str(articles_dir))
+
+    hits = store.search(embedder, 'folding proteins with attention over amino acid chains.')
+    assert hits[0]['file_path'] == paths['proteins']
+    assert (hits[0]['section'], hits[0]['paragraph']) == (0, 0)
+
+
+def test_related_returns_nearest_other_articles(tmp_path, library, embedder):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+    store.update(embedder, str(articles_dir))
+
+    related = store.related(paths['robots'], limit=2)
+    assert [entry['file_path'] for entry in related] == [paths['robot_arms'], paths['proteins']]
+
+
+def test_deleted_articles_drop_out(tmp_path, library, embedder):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+    store.update(embedder, str(articles_dir))
+
+    (articles_dir / '1_arms.json').unlink()
+    store.update(embedder, str(articles_dir))
+    assert paths['robot_arms'] not in [entry['file_path'] for entry in store.related(paths['robots'])]
+    assert paths['robot_arms'] not in [hit['file_path'] for hit in store.search(embedder, 'robot arms grasp')]
+
+
+def test_related_answers_while_a_search_waits_on_the_endpoint(tmp_path, library, embedder, stub_server):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+    store.update(embedder, str(articles_dir))
+
+    stub_server.gate.clear()
+    calls = stub_server.calls
+    search = threading.Thread(target=store.search, args=(embedder, 'robots'))
+    search.start()
+    try:
+        deadline = time.monotonic() + 5
+        while stub_server.calls == calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started_at = time.monotonic()
+        assert store.related(paths['robots'], limit=1)[0]['file_path'] == paths['robot_arms']
+        assert time.monotonic() - started_at < 1
+    finally:
+        stub_server.gate.set()
+        search.join(10)
+
+
+def test_related_answers_while_an_update_waits_on_the_endpoint(tmp_path, library, embedder, stub_server):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+    store.update(embedder, str(articles_dir))
+
+    write_article(articles_dir, '3_vision.json', 'Vision transformers', ['Patches of images as tokens.'])
+    stub_server.gate.clear()
+    update = threading.Thread(target=store.update, args=(embedder, str(articles_dir)))
+    update.start()
+    try:
+        deadline = time.monotonic() + 5
+        while stub_server.calls < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started_at = time.monotonic()
+        related = store.related(paths['robots'], limit=1)
+        assert time.monotonic() - started_at < 1
+        assert related[0]['file_path'] == paths['robot_arms']
+    finally:
+        stub_server.gate.set()
+        update.join(10)
+
+
+def test_update_stops_between_articles_and_resumes(tmp_path, library, embedder):
+    articles_dir, paths = library
+    store = EmbeddingStore(str(tmp_path / 'store'))
+
+    calls = []
+    def stop_after_first():
+        calls.append(1)
+        return len(calls) > 1
+
+    assert store.update(embedder, str(articles_dir), should_stop=stop_after_first) == {'embedded': 1, 'skipped': 0}
+    assert store.update(embedder, str(articles_dir)) == {'embedded': 2, 'skipped': 1}
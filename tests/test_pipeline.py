@@ -0,0 +1,92 @@
+import json
+import os
+import socket
+import time
+
+import pytest
+
+from src import pipeline
+from src.pipeline import PipelineJob
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(tmp_path, monkeypatch):
+    # Keep the run reports finished jobs write out of the repository's data directory
+    monkeypatch.setattr('src.utils.metrics.get_metrics_dir', lambda: str(tmp_path / 'metrics'))
+
+
+def write_lock(job, pid, age_s, host=None):
+    os.makedirs(os.path.dirname(job.lock_path), exist_ok=True)
+    with open(job.lock_path, 'w', encoding='utf-8') as f:
+        json.dump({'pid': pid, 'host': host or socket.gethostname(), 'acquired_at': 0}, f)
+    mtime = time.time() - age_s
+    os.utime(job.lock_path, (mtime, mtime))
+
+
+def write_running_state(job):
+    job._save_state({'status': 'running', 'step': 0, 'progress': 0.0})
+
+
+def test_lock_of_a_live_owner_is_respected(tmp_path):
+    job = PipelineJob(str(tmp_path))
+    write_lock(job, os.getpid(), age_s=5)
+    write_running_state(job)
+
+    assert job.status()['status'] == 'running'
+    assert job._begin() is None
+
+
+def test_lock_without_heartbeat_is_taken_over_even_if_its_pid_is_reused(tmp_path):
+    # After a crash and restart, this process can hold the pid recorded in the old lock
+    job = PipelineJob(str(tmp_path))
+    write_lock(job, os.getpid(), age_s=pipeline.STALE_LOCK_SECONDS + 60)
+    write_running_state(job)
+
+    assert job.status()['status'] == 'interrupted'
+    assert job.run(lambda report, should_stop: {})['status'] == 'complete'
+    assert not os.path.exists(job.lock_path)
+
+
+def test_lock_of_a_dead_owner_is_taken_over_at_once(tmp_path):
+    job = PipelineJob(str(tmp_path))
+    write_lock(job, 2 ** 22 + 12345, age_s=0)
+
+    assert job._begin() is not None
+    assert job._read_lock()['pid'] == os.getpid()
+
+
+def test_lock_on_another_host_is_live_until_its_heartbeat_stops(tmp_path):
+    job = PipelineJob(str(tmp_path))
+    write_lock(job, 1, age_s=5, host='other-host')
+    assert job._begin() is None
+
+    write_lock(job, 1, age_s=pipeline.STALE_LOCK_SECONDS + 60, host='other-host')
+    assert job._begin() is not None
+
+
+def test_release_removes_only_our_own_lock(tmp_path):
+    ours = PipelineJob(str(tmp_path))
+    assert ours._begin() is not None
+    ours._release_lock()
+    assert not os.path.exists(ours.lock_path)
+
+    assert ours._begin() is not None
+    # Another run took the lock over, e.g. after our heartbeat stalled
+    write_lock(ours, os.getpid() + 1, age_s=0, host='other-host')
+    ours._release_lock()
+    assert ours._read_lock()['host'] == 'other-host'
+
+
+def test_heartbeat_keeps_a_long_run_live(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, 'HEARTBEAT_SECONDS', 0.05)
+    job = PipelineJob(str(tmp_path))
+    other = PipelineJob(str(tmp_path))
+
+    def slow_runner(report, should_stop):
+        old = time.time() - pipeline.STALE_LOCK_SECONDS - 60
+        os.utime(job.lock_path, (old, old))
+        time.sleep(0.3)
+        assert other._begin() is None
+        return {}
+
+    assert job.run(slow_runner)['status'] == 'complete'
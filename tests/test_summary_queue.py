@@ -0,0 +1,59 @@
+import json
+import time
+
+import pytest
+
+from src import summary_queue
+from src.summary_queue import SummaryQueue
+
+
+@pytest.fixture(autouse=True)
+def no_read_status(monkeypatch):
+    monkeypatch.setattr(summary_queue, 'load_read_status', lambda: {})
+
+
+def test_instances_on_one_database_share_the_queue(tmp_path):
+    # Stands in for the app, the command-line pipeline and a migration
+    app, cli = SummaryQueue(str(tmp_path / 'queue.db')), SummaryQueue(str(tmp_path / 'queue.db'))
+    app.push('a.json', '2024-01-01')
+    cli.push('b.json', '2024-01-02')
+    app.push('c.json', '2024-01-03')
+
+    assert len(app) == len(cli) == 3
+    assert 'b.json' in app and 'a.json' in cli
+
+
+def test_pop_orders_by_request_then_date_and_claims_once(tmp_path):
+    first, second = SummaryQueue(str(tmp_path / 'queue.db')), SummaryQueue(str(tmp_path / 'queue.db'))
+    first.push('old.json', '2023-01-01')
+    first.push('new.json', '2024-06-01')
+    first.push('asked.json', '2020-01-01', requested=True)
+
+    claimed = [first.pop(), second.pop(), first.pop()]
+    assert claimed == ['asked.json', 'new.json', 'old.json']
+    assert second.pop() is None
+
+    # Claimed articles stay queued until done(); released ones can be claimed again
+    first.release('new.json')
+    assert second.pop() == 'new.json'
+    second.done('new.json')
+    assert 'new.json' not in first and len(first) == 2
+
+
+def test_claims_of_dead_or_stalled_workers_expire(tmp_path, monkeypatch):
+    queue = SummaryQueue(str(tmp_path / 'queue.db'))
+    queue.push('a.json')
+    assert queue.pop() == 'a.json'
+    assert queue.pop() is None
+
+    monkeypatch.setattr(summary_queue, 'CLAIM_TIMEOUT_SECONDS', -1)
+    assert queue.pop() == 'a.json'
+
+
+def test_legacy_json_queue_is_imported(tmp_path):
+    legacy = {'a.json': {'published': 1, 'requested': True, 'enqueued_at': time.time()}}
+    (tmp_path / 'summary_queue.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    queue = SummaryQueue(str(tmp_path / 'summary_queue.db'))
+    assert 'a.json' in queue
+    assert queue.pop() == 'a.json'